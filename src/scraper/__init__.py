@@ -1,21 +1,37 @@
 import asyncio
+import os
 from dataclasses import dataclass
 from datetime import timedelta
+from typing import FrozenSet, Literal, Optional
 
 import aiohttp
-from sentence_transformers import SentenceTransformer
 from tqdm.asyncio import tqdm
 from yarl import URL
 
-from .cache import Cache
+from .cache import Cache, WriteBehindCache
+from .canonicalizer import DEFAULT_IGNORED_PARAMS, Canonicalizer
+from .crawler import CrawlOrder
+from .dedup import Deduplicator
+from .embeddings import EmbeddingCache
+from .encoder import AbstractEncoder, OnnxEncoder, TorchEncoder, compare_encoders
 from .fetcher import Fetcher
 from .indexer import Indexer
+from .lexicon import LexicalIndex
 from .scraper import Scraper
 
-# Load pre-trained model
-model = SentenceTransformer("sentence-transformers/multi-qa-mpnet-base-dot-v1")
+# Pre-trained model
+MODEL_NAME = "sentence-transformers/multi-qa-mpnet-base-dot-v1"
 
-__all__ = ("Indexer", "scrap", "ScrapConfig")
+__all__ = (
+    "Canonicalizer",
+    "Deduplicator",
+    "Indexer",
+    "LexicalIndex",
+    "compare_encoders",
+    "load_encoder",
+    "scrap",
+    "ScrapConfig",
+)
 
 
 @dataclass
@@ -27,28 +43,127 @@ class ScrapConfig:
 
     cache_dir: str = ".cache"
     cache_ttl: timedelta = timedelta(weeks=1)
+    cache_batch_size: int = 64
+    cache_flush_interval: timedelta = timedelta(seconds=1)
+
+    crawl_concurrency: int = 64
+    crawl_bloom_capacity: Optional[int] = None
+    crawl_order: CrawlOrder = "depth"
+    crawl_max_depth: Optional[int] = None
+    crawl_max_pages: Optional[int] = None
+    crawl_budget: Optional[timedelta] = None
+
+    url_allowed_params: Optional[FrozenSet[str]] = None
+    url_ignored_params: FrozenSet[str] = DEFAULT_IGNORED_PARAMS
+    url_strip_trailing_slash: bool = True
+    url_follow_canonical: bool = True
+    url_follow_redirects: bool = True
+
+    dedup: bool = True
+    dedup_page_threshold: float = 0.95
+    dedup_chunk_threshold: float = 0.95
+    dedup_shingle_size: int = 3
+    lexicon: bool = True
+    lexicon_k1: float = 1.5
+    lexicon_b: float = 0.75
+    lexicon_title_boost: int = 3
+
+    model: str = MODEL_NAME
+    encoder_backend: Literal["torch", "onnx"] = "torch"
+    encoder_quantize: bool = False
+    encoder_threads: Optional[int] = None
+
+
+def load_encoder(config: ScrapConfig) -> AbstractEncoder:
+    if config.encoder_backend == "onnx":
+        return OnnxEncoder(
+            config.model,
+            path=os.path.join(config.cache_dir, "onnx"),
+            quantize=config.encoder_quantize,
+            threads=config.encoder_threads,
+        )
+
+    return TorchEncoder(config.model)
 
 
 async def scrap(config: ScrapConfig) -> Indexer:
     loop = asyncio.get_event_loop()
 
-    async with aiohttp.ClientSession(loop=loop) as session:
-        cache = Cache(path=config.cache_dir, loop=loop)
+    # Pending cache writes are flushed on exit
+    cache = WriteBehindCache(
+        Cache(path=config.cache_dir, loop=loop),
+        batch_size=config.cache_batch_size,
+        flush_interval=config.cache_flush_interval,
+        loop=loop,
+    )
+
+    # Aliases are learned anew on every run
+    canonicalizer = Canonicalizer(
+        allowed_params=config.url_allowed_params,
+        ignored_params=config.url_ignored_params,
+        strip_trailing_slash=config.url_strip_trailing_slash,
+        follow_canonical=config.url_follow_canonical,
+        follow_redirects=config.url_follow_redirects,
+    )
+
+    async with aiohttp.ClientSession(loop=loop) as session, cache:
         fetcher = Fetcher(
-            session, config.timeout, cache_map=cache, cache_ttl=config.cache_ttl
+            session,
+            config.timeout,
+            cache_map=cache,
+            cache_ttl=config.cache_ttl,
+            canonicalizer=canonicalizer,
         )
 
-        indexer = Indexer(model, dimension=768, threshold=0.9)
-
-        scraper = Scraper(fetcher, indexer, loop=loop)
+        encoder = load_encoder(config)
 
-        with tqdm(total=0, desc="Crawling") as pbar:
-            crawled_urls = await scraper.crawl_page(
-                config.root, host=config.host, pbar=pbar
+        lexicon = None
+        if config.lexicon:
+            lexicon = LexicalIndex(
+                k1=config.lexicon_k1,
+                b=config.lexicon_b,
+                title_boost=config.lexicon_title_boost,
             )
 
-        with tqdm(total=len(crawled_urls), desc="Indexing") as pbar:
-            for url in crawled_urls:
+        embedding_cache = EmbeddingCache(
+            path=os.path.join(config.cache_dir, "embeddings"),
+            model=encoder.name,
+            dimension=encoder.dimension,
+        )
+
+        indexer = Indexer(
+            encoder,
+            dimension=encoder.dimension,
+            threshold=0.9,
+            embedding_cache=embedding_cache,
+            dedup=config.dedup,
+            dedup_page_threshold=config.dedup_page_threshold,
+            dedup_chunk_threshold=config.dedup_chunk_threshold,
+            dedup_shingle_size=config.dedup_shingle_size,
+            lexicon=lexicon,
+        )
+
+        scraper = Scraper(fetcher, indexer, canonicalizer=canonicalizer, loop=loop)
+
+        crawl_pbar = tqdm(total=0, desc="Crawling", position=0)
+        index_pbar = tqdm(total=0, desc="Indexing", position=1)
+
+        # New embeddings are flushed even if the crawl fails halfway
+        with crawl_pbar, index_pbar, embedding_cache:
+            # Crawled URLs stream into indexing while the crawl goes on
+            async for url in scraper.crawl_page(
+                config.root,
+                host=config.host,
+                concurrency=config.crawl_concurrency,
+                bloom_capacity=config.crawl_bloom_capacity,
+                order=config.crawl_order,
+                max_depth=config.crawl_max_depth,
+                max_pages=config.crawl_max_pages,
+                budget=config.crawl_budget,
+                pbar=crawl_pbar,
+            ):
+                index_pbar.total += 1
+
                 page = await fetcher(url)
 
                 if page:
@@ -56,8 +171,15 @@ async def scrap(config: ScrapConfig) -> Indexer:
                     # converted to markdown. The content is assumed to be in
                     # the `div.mw-parser-output` tag. Otherwise, the content
                     # will NOT be indexed.
-                    scraper.index_page(url, page)
+                    await loop.run_in_executor(None, scraper.index_page, url, page)
+
+                stats = indexer.dedup_stats
+                if stats is not None:
+                    index_pbar.set_postfix(
+                        dup_pages=f"{stats.page_shrinkage:.1%}",
+                        dup_chunks=f"{stats.shrinkage:.1%}",
+                    )
 
-                pbar.update(1)
+                index_pbar.update(1)
 
         return indexer
@@ -3,7 +3,10 @@ from __future__ import annotations
 import asyncio
 import os
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Coroutine, Dict, List, Optional, Set
 
 import aiofiles
 import aiofiles.os
@@ -13,7 +16,7 @@ from src.utils.hash import generate_sha
 
 from .types import PageMeta
 
-__all__ = ("AbstractCache", "Cache")
+__all__ = ("AbstractCache", "Cache", "WriteBehindCache")
 
 
 class AbstractCache(ABC):
@@ -162,3 +165,235 @@ class Cache(AbstractCache):
         """
         async with aiofiles.open(filename, "r", loop=self._loop) as file:
             return await file.read()
+
+
+@dataclass
+class _PendingWrite:
+    meta: Optional[PageMeta] = None
+    """Page metadata to set if any."""
+    page: Optional[str] = None
+    """Page content to set if any."""
+    delete: bool = False
+    """Whether to forget page content."""
+
+
+class WriteBehindCache(AbstractCache):
+    def __init__(
+        self,
+        cache: AbstractCache,
+        *,
+        batch_size: int = 64,
+        flush_interval: timedelta = timedelta(seconds=1),
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        """
+        :param cache: Underlying cache to write to.
+        :param batch_size: Number of pending URLs that triggers a flush.
+        :param flush_interval: Maximum time a write stays pending.
+        :param loop: Asynchronous event loop.
+        """
+        self._cache = cache
+
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+
+        self._loop = loop or asyncio.get_event_loop()
+
+        # URL -> Pending write; repeated writes to the same URL coalesce
+        self._pending: Dict[URL, _PendingWrite] = {}
+        self._flushing: Dict[URL, _PendingWrite] = {}
+
+        self._lock = asyncio.Lock()
+
+        self._full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task[None]] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+
+    async def __aenter__(self) -> WriteBehindCache:
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def set_meta(self, url: URL, meta: PageMeta) -> None:
+        """
+        Set metadata for specified URL. Write it later.
+
+        :param url: URL of the page.
+        :param meta: Page metadata.
+        """
+        self._pending.setdefault(url, _PendingWrite()).meta = meta
+        self._schedule_flush()
+
+    async def get_meta(self, url: URL) -> Optional[PageMeta]:
+        """
+        Get metadata for specified URL. Pending writes take precedence.
+
+        :param url: URL of the page.
+        :return: Page metadata if exists; None otherwise.
+        """
+        for write in self._lookup(url):
+            if write.meta is not None:
+                return write.meta
+
+        return await self._cache.get_meta(url)
+
+    async def set_page(self, url: URL, page: str) -> None:
+        """
+        Set page content for specified URL. Write it later.
+
+        :param url: URL of the page.
+        :param page: Page content.
+        """
+        write = self._pending.setdefault(url, _PendingWrite())
+        write.page = page
+        write.delete = False
+
+        self._schedule_flush()
+
+    async def get_page(self, url: URL) -> str:
+        """
+        Get page content for specified URL. Pending writes take precedence.
+
+        :param url: URL of the page.
+        :return: Page content.
+        """
+        for write in self._lookup(url):
+            if write.delete:
+                raise FileNotFoundError(url.human_repr())
+            if write.page is not None:
+                return write.page
+
+        return await self._cache.get_page(url)
+
+    async def delele_page(self, url: URL) -> None:
+        """
+        Forget page content for specified URL. Forget it later.
+
+        :param url: URL of the page.
+        """
+        write = self._pending.setdefault(url, _PendingWrite())
+        write.page = None
+        write.delete = True
+
+        self._schedule_flush()
+
+    async def flush(self) -> None:
+        """
+        Write all pending writes to the underlying cache.
+        """
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+
+            # Keep the batch readable until it reaches the underlying cache
+            self._flushing = batch
+
+            try:
+                await asyncio.gather(
+                    *(self._write(url, write) for url, write in batch.items())
+                )
+            except BaseException:
+                # Requeue writes that have not been superseded meanwhile
+                for url, write in batch.items():
+                    self._pending.setdefault(url, write)
+                raise
+            finally:
+                self._flushing = {}
+
+    async def close(self) -> None:
+        """
+        Wait for scheduled flushes and write the remaining pending writes.
+        Writes of failed flushes are retried here, so only an error of this
+        last flush is raised.
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        await self.flush()
+
+    def _lookup(self, url: URL) -> List[_PendingWrite]:
+        """
+        Find writes of specified URL that have not reached the underlying
+        cache yet.
+
+        :param url: URL of the page.
+        :return: Pending writes, newest first.
+        """
+        writes = (self._pending.get(url), self._flushing.get(url))
+
+        return [write for write in writes if write is not None]
+
+    def _schedule_flush(self) -> None:
+        """
+        Flush in the background once the batch is full or the flush interval
+        has passed since the first pending write.
+        """
+        if self._flusher is None:
+            self._flusher = self._spawn(self._flush_later())
+
+        if len(self._pending) >= self._batch_size:
+            self._full.set()
+
+    async def _flush_later(self) -> None:
+        """
+        Flush when the batch is full or after the flush interval.
+        """
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                self._full.wait(), self._flush_interval.total_seconds()
+            )
+
+        # Writes from now on schedule the next flush
+        self._full.clear()
+        self._flusher = None
+
+        await self.flush()
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> asyncio.Task[None]:
+        """
+        Run a flush in the background.
+
+        :param coro: Flush coroutine.
+        :return: Background task.
+        """
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+
+        task.add_done_callback(self._on_task_done)
+
+        return task
+
+    def _on_task_done(self, task: asyncio.Task[None]) -> None:
+        """
+        Forget the finished background task.
+
+        :param task: Background task.
+        """
+        self._tasks.discard(task)
+
+        # Writes of a failed flush are requeued; retrieve the error so that it
+        # is not reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def _write(self, url: URL, write: _PendingWrite) -> None:
+        """
+        Write a pending write to the underlying cache.
+
+        :param url: URL of the page.
+        :param write: Pending write.
+        """
+        if write.page is not None:
+            await self._cache.set_page(url, write.page)
+        elif write.delete:
+            # The page might have never reached the underlying cache
+            with suppress(FileNotFoundError):
+                await self._cache.delele_page(url)
+
+        # Metadata goes last so that it never points to a missing page
+        if write.meta is not None:
+            await self._cache.set_meta(url, write.meta)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import re
+import string
+from typing import Collection, Dict, FrozenSet, Optional
+from urllib.parse import unquote_plus
+
+from yarl import URL
+
+__all__ = ("Canonicalizer", "DEFAULT_IGNORED_PARAMS")
+
+# MediaWiki query parameters that select an alternative view of the same page
+DEFAULT_IGNORED_PARAMS: FrozenSet[str] = frozenset(
+    {
+        "action",
+        "curid",
+        "diff",
+        "mobileaction",
+        "oldid",
+        "printable",
+        "redirect",
+        "useskin",
+        "uselang",
+        "veaction",
+    }
+)
+
+
+_ESCAPE_PATTERN = re.compile(r"%([0-9A-Fa-f]{2})")
+
+# Characters that mean the same whether percent-encoded or not
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+
+
+class Canonicalizer:
+    def __init__(
+        self,
+        *,
+        allowed_params: Optional[Collection[str]] = None,
+        ignored_params: Collection[str] = DEFAULT_IGNORED_PARAMS,
+        strip_trailing_slash: bool = True,
+        follow_canonical: bool = True,
+        follow_redirects: bool = True,
+    ) -> None:
+        """
+        :param allowed_params: Query parameters to keep; all other parameters
+            are dropped. Keep every parameter except ignored ones if None.
+        :param ignored_params: Query parameters to drop.
+        :param strip_trailing_slash: Whether to strip the trailing slash of
+            the path.
+        :param follow_canonical: Whether to follow `<link rel="canonical">`.
+        :param follow_redirects: Whether to follow HTTP redirects.
+        """
+        self._allowed_params = (
+            None if allowed_params is None else frozenset(allowed_params)
+        )
+        self._ignored_params = frozenset(ignored_params)
+        self._strip_trailing_slash = strip_trailing_slash
+
+        self.follow_canonical = follow_canonical
+        self.follow_redirects = follow_redirects
+
+        # Normalized URL -> Canonical URL
+        self._aliases: Dict[URL, URL] = {}
+
+    def __call__(self, url: URL) -> URL:
+        """
+        Canonicalize the given URL. Resolve aliases learned from redirects
+        and canonical links.
+
+        :param url: URL to canonicalize.
+        :return: Canonical URL.
+        """
+        url = self._normalize(url)
+
+        seen = {url}
+        while (target := self._aliases.get(url)) is not None and target not in seen:
+            seen.add(target)
+            url = target
+
+        return url
+
+    def learn(self, url: URL, target: URL) -> None:
+        """
+        Remember that the page at the URL is the same as the page at the
+        target URL.
+
+        :param url: URL of the page.
+        :param target: Canonical URL of the page.
+        """
+        url = self._normalize(url)
+        target = self._normalize(target)
+
+        # Aliases never leave the host, so the crawler can always follow them
+        if url.host != target.host or target.scheme not in {"http", "https"}:
+            return
+
+        # Never introduce alias cycles
+        if url == target or self(target) == url:
+            return
+
+        self._aliases[url] = target
+
+    def _normalize(self, url: URL) -> URL:
+        """
+        Normalize the given URL without resolving aliases. Drop the fragment,
+        lowercase the scheme and host, drop the default port, unify
+        percent-encoding and filter query parameters.
+
+        :param url: URL to normalize.
+        :return: Normalized URL.
+        """
+        if not url.absolute:
+            return url.with_fragment(None)
+
+        # Work on the encoded form; decoding reserved escapes such as `%2F`
+        # would point the URL to a different resource
+        path = _normalize_escapes(url.raw_path)
+        if self._strip_trailing_slash and len(path) > 1:
+            path = path.rstrip("/") or "/"
+
+        query = sorted(
+            _normalize_escapes(param)
+            for param in url.raw_query_string.split("&")
+            if param and self._should_keep_param(unquote_plus(param.split("=")[0]))
+        )
+
+        return URL.build(
+            scheme=url.scheme.lower(),
+            user=url.raw_user,
+            password=url.raw_password,
+            host=(url.raw_host or "").lower(),
+            port=None if url.is_default_port() else url.port,
+            path=path or "/",
+            query_string="&".join(query),
+            encoded=True,
+        )
+
+    def _should_keep_param(self, key: str) -> bool:
+        """
+        Check if the query parameter should be kept.
+
+        :param key: Name of the parameter.
+        :return: True if the parameter should be kept; False otherwise.
+        """
+        if self._allowed_params is not None:
+            return key in self._allowed_params
+
+        return key not in self._ignored_params
+
+
+def _normalize_escapes(raw: str) -> str:
+    """
+    Decode escaped unreserved characters and uppercase the remaining escapes.
+
+    :param raw: Percent-encoded URL component.
+    :return: Normalized URL component.
+    """
+
+    def replace(match: re.Match[str]) -> str:
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else "%" + match.group(1).upper()
+
+    return _ESCAPE_PATTERN.sub(replace, raw)
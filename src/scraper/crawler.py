@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Awaitable, Dict, Optional, Set
+import itertools
+from datetime import timedelta
+from typing import AsyncIterator, List, Literal, Optional, Tuple
 
 from tqdm.asyncio import tqdm
 from yarl import URL
@@ -9,9 +11,16 @@ from yarl import URL
 from src.utils.href import normalize_href
 from src.utils.html import extract_hrefs
 
+from .canonicalizer import Canonicalizer
 from .fetcher import Fetcher
+from .visited import VisitedSet
 
-__all__ = ("Crawler",)
+__all__ = ("Crawler", "CrawlOrder")
+
+CrawlOrder = Literal["depth", "expiry", "change"]
+
+# Priority, Sequence number, Depth, URL
+_FrontierItem = Tuple[Tuple[float, ...], int, int, URL]
 
 
 class Crawler:
@@ -20,83 +29,235 @@ class Crawler:
         fetcher: Fetcher,
         *,
         host: Optional[str] = None,
+        canonicalizer: Optional[Canonicalizer] = None,
+        concurrency: int = 64,
+        bloom_capacity: Optional[int] = None,
+        order: CrawlOrder = "depth",
+        max_depth: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        budget: Optional[timedelta] = None,
         loop: Optional[asyncio.AbstractEventLoop] = None,
         pbar: Optional[tqdm] = None,
     ) -> None:
         """
         :param fetcher: Page fetcher.
         :param host: Trusted host.
+        :param canonicalizer: URL canonicalizer. Should be shared with the
+            fetcher.
+        :param concurrency: Number of pages crawled at once.
+        :param bloom_capacity: Expected number of URLs of the Bloom filter in
+            front of the visited set. Skip the Bloom filter if None.
+        :param order: Order of the frontier. "depth" crawls pages closest to
+            the root first; "expiry" crawls pages whose cache expires soonest
+            first; "change" crawls pages that changed most often first. Pages
+            never seen before go first in the last two orders.
+        :param max_depth: Maximum number of links from the root to follow.
+        :param max_pages: Maximum number of pages to crawl.
+        :param budget: Wall-clock time after which no more pages are started.
         :param loop: Asynchronous event loop.
         :param pbar: Progress bar.
         """
         self._fetcher = fetcher
 
         self._host = host
+        self._canonicalizer = canonicalizer
+        self._concurrency = concurrency
+        self._order = order
+        self._max_depth = max_depth
+        self._max_pages = max_pages
+        self._budget = budget
         self._loop = loop or asyncio.get_event_loop()
         self._pbar = pbar
 
-        # URL -> Task
-        self._pool: Dict[URL, asyncio.Task[None]] = {}
-        self._done: Set[URL] = set()
+        # Fingerprints of discovered URLs
+        self._visited = VisitedSet(bloom_capacity=bloom_capacity)
+
+        self._frontier: asyncio.PriorityQueue[_FrontierItem] = asyncio.PriorityQueue()
+        # Keeps the frontier FIFO among equal priorities
+        self._sequence = itertools.count()
+
+        self._started = 0
+        self._deadline: Optional[float] = None
+        # Crawled URLs wait here until consumed, so a slow consumer throttles
+        # the crawl instead of piling them up
+        self._done: asyncio.Queue[URL] = asyncio.Queue(maxsize=concurrency)
 
-    @property
-    def done(self) -> Set[URL]:
+    async def __call__(self, url: URL) -> AsyncIterator[URL]:
         """
-        Get URLs that have been crawled.
+        Crawl site starting at specified URL. Yield URLs as soon as they have
+        been crawled.
 
-        :return: URLs that have been crawled.
+        :param url: URL of the page.
+        :return: Yields crawled URLs.
         """
-        return self._done
+        if self._budget is not None:
+            self._deadline = self._loop.time() + self._budget.total_seconds()
+
+        await self._discover(url, 0)
+
+        workers = [
+            self._loop.create_task(self._work()) for _ in range(self._concurrency)
+        ]
+        supervisor = self._loop.create_task(self._supervise(workers))
+
+        try:
+            while not supervisor.done() or not self._done.empty():
+                get = self._loop.create_task(self._done.get())
+
+                await asyncio.wait(
+                    {get, supervisor}, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not get.done():
+                    get.cancel()
+                    continue
+
+                yield get.result()
+
+            # Propagate errors of workers
+            supervisor.result()
+        finally:
+            supervisor.cancel()
+
+            for worker in workers:
+                worker.cancel()
+
+    async def _supervise(self, workers: List[asyncio.Task[None]]) -> None:
+        """
+        Wait until the frontier is exhausted or a worker fails.
+
+        :param workers: Worker tasks.
+        """
+        join = self._loop.create_task(self._frontier.join())
+
+        try:
+            await asyncio.wait([join, *workers], return_when=asyncio.FIRST_COMPLETED)
+
+            # Workers only stop early by raising
+            for worker in workers:
+                if worker.done():
+                    worker.result()
+        finally:
+            join.cancel()
+
+            for worker in workers:
+                worker.cancel()
+
+    async def _work(self) -> None:
+        """
+        Crawl pages from the frontier one by one.
+        """
+        while True:
+            _, _, depth, url = await self._frontier.get()
+
+            try:
+                if self._is_exhausted():
+                    # Drain the frontier so that the crawl can finish
+                    if self._pbar is not None:
+                        self._pbar.total -= 1
+                    continue
+
+                self._started += 1
+                await self._crawl_page(url, depth)
+            finally:
+                self._frontier.task_done()
 
-    def __call__(self, url: URL) -> Awaitable[None]:
+    def _is_exhausted(self) -> bool:
         """
-        Crawl page at specified URL. Create an asynchronous task. Return the
-        existing task when the same URL is called again.
+        Check if the crawl budget is exhausted.
+
+        :return: True if no more pages should be started; False otherwise.
+        """
+        if self._max_pages is not None and self._started >= self._max_pages:
+            return True
+        if self._deadline is not None and self._loop.time() >= self._deadline:
+            return True
+
+        return False
+
+    async def _discover(self, url: URL, depth: int) -> None:
+        """
+        Put URL into the frontier unless it has been discovered before or it
+        is out of the crawl limits.
 
         :param url: URL of the page.
-        :return: Cached or new task for the specified URL.
+        :param depth: Number of links from the root to the page.
         """
-        task = self._pool.get(url)
+        if self._max_depth is not None and depth > self._max_depth:
+            return
+        if self._is_exhausted():
+            return
+
+        url = self._canonicalize(url)
 
-        if task:
-            return task
+        if not self._visited.add(url):
+            return
 
         if self._pbar is not None:
             self._pbar.total += 1
 
-        coro = self._crawl_page(url)
-        task = self._loop.create_task(coro)
+        priority = await self._prioritize(url, depth)
+        self._frontier.put_nowait((priority, next(self._sequence), depth, url))
+
+    async def _prioritize(self, url: URL, depth: int) -> Tuple[float, ...]:
+        """
+        Compute the frontier priority of the page. Lower goes first.
+
+        :param url: URL of the page.
+        :param depth: Number of links from the root to the page.
+        :return: Priority of the page.
+        """
+        if self._order == "depth":
+            return (depth,)
+
+        meta = await self._fetcher.get_meta(url)
+
+        if meta is None:
+            return (float("-inf"), depth)
 
-        self._pool[url] = task
+        if self._order == "expiry":
+            return (meta.exp.timestamp(), depth)
 
-        return task
+        return (-meta.change_rate, depth)
 
-    async def _crawl_page(self, url: URL) -> None:
+    async def _crawl_page(self, url: URL, depth: int) -> None:
         """
         Crawl page at specified URL.
 
         :param url: URL of the page.
+        :param depth: Number of links from the root to the page.
         """
         page = await self._fetcher(url)
 
-        self._done.add(url)
-
         if self._pbar is not None:
             self._pbar.update(1)
 
-        if page is None:
+        # The page turned out to be an alias, e.g. it redirects or declares
+        # another canonical URL. Crawl the canonical page instead.
+        canonical = self._canonicalize(url)
+        if canonical != url:
+            if _should_crawl_page(canonical, self._host):
+                await self._discover(canonical, depth)
             return
 
-        hrefs = set(
-            normalize_href(href, url)
-            for href in extract_hrefs(page)
-            if _should_crawl_page(href, self._host)
-        )
+        if page is not None:
+            for href in extract_hrefs(page):
+                if _should_crawl_page(href, self._host):
+                    await self._discover(normalize_href(href, url), depth + 1)
+
+        await self._done.put(url)
+
+    def _canonicalize(self, url: URL) -> URL:
+        """
+        Canonicalize URL if canonicalizer is set.
+
+        :param url: URL of the page.
+        :return: Canonical URL.
+        """
+        if self._canonicalizer is None:
+            return url
 
-        # Spawn asynchronous tasks for each URL.
-        coros = [self(href) for href in hrefs if href not in self._pool]
-        if coros:
-            await asyncio.gather(*coros)
+        return self._canonicalizer(url)
 
 
 def _should_crawl_page(href: URL, host: Optional[str]) -> bool:
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from src.utils.hash import generate_fingerprint
+from src.utils.text import split_words
+
+__all__ = ("Deduplicator", "DedupStats")
+
+K = TypeVar("K", bound=Hashable)
+
+# Number of bits in a SimHash signature
+_BITS = 64
+
+
+@dataclass
+class DedupStats:
+    pages: int = 0
+    """Number of pages checked."""
+    duplicate_pages: int = 0
+    """Number of pages skipped as near-duplicates."""
+    chunks: int = 0
+    """Number of chunks checked."""
+    duplicate_chunks: int = 0
+    """Number of chunks skipped as near-duplicates."""
+
+    @property
+    def shrinkage(self) -> float:
+        """Share of chunks kept out of the index by chunk deduplication."""
+        return self.duplicate_chunks / self.chunks if self.chunks else 0.0
+
+    @property
+    def page_shrinkage(self) -> float:
+        """Share of pages kept out of the index by page deduplication."""
+        return self.duplicate_pages / self.pages if self.pages else 0.0
+
+
+class Deduplicator:
+    def __init__(
+        self,
+        *,
+        page_threshold: float = 0.95,
+        chunk_threshold: float = 0.95,
+        shingle_size: int = 3,
+    ) -> None:
+        """
+        :param page_threshold: Similarity threshold of near-duplicate pages.
+        :param chunk_threshold: Similarity threshold of near-duplicate chunks.
+        :param shingle_size: Number of words in a shingle.
+
+        Similarity is the share of equal bits in SimHash signatures, so 1.0
+        only matches texts with equal signatures.
+        """
+        self._shingle_size = shingle_size
+
+        self._pages: _SimHashIndex = _SimHashIndex(page_threshold)
+        self._chunks: _SimHashIndex = _SimHashIndex(chunk_threshold)
+
+        self._stats = DedupStats()
+
+    @property
+    def stats(self) -> DedupStats:
+        """
+        Get deduplication statistics.
+
+        :return: Deduplication statistics.
+        """
+        return self._stats
+
+    def check_page(self, key: K, text: str) -> Optional[K]:
+        """
+        Check if the page is a near-duplicate of a known page. Remember the
+        page otherwise.
+
+        :param key: Key of the page.
+        :param text: Content of the page.
+        :return: Key of the canonical page if the page is a near-duplicate;
+            None otherwise.
+        """
+        self._stats.pages += 1
+
+        canonical = self._pages.match_or_add(key, self._signature(text))
+        if canonical is not None:
+            self._stats.duplicate_pages += 1
+
+        return canonical
+
+    def check_chunk(self, key: K, text: str) -> Optional[K]:
+        """
+        Check if the chunk is a near-duplicate of a known chunk. Remember the
+        chunk otherwise.
+
+        :param key: Key of the chunk.
+        :param text: Content of the chunk.
+        :return: Key of the canonical chunk if the chunk is a near-duplicate;
+            None otherwise.
+        """
+        self._stats.chunks += 1
+
+        canonical = self._chunks.match_or_add(key, self._signature(text))
+        if canonical is not None:
+            self._stats.duplicate_chunks += 1
+
+        return canonical
+
+    def _signature(self, text: str) -> int:
+        """
+        Compute the SimHash signature of the text over word shingles.
+
+        :param text: Text to sign.
+        :return: 64-bit signature.
+        """
+        words = split_words(text)
+
+        n = max(len(words) - self._shingle_size + 1, 1)
+        shingles = (" ".join(words[i : i + self._shingle_size]) for i in range(n))
+
+        hashes = np.array([generate_fingerprint(s) for s in shingles], dtype=">u8")
+
+        # Each shingle votes for the bits of its hash
+        bits = np.unpackbits(hashes.view(np.uint8)).reshape(-1, _BITS)
+        votes = bits.sum(axis=0) * 2 > len(hashes)
+
+        return int.from_bytes(np.packbits(votes).tobytes(), "big")
+
+
+class _SimHashIndex(Generic[K]):
+    def __init__(self, threshold: float) -> None:
+        """
+        :param threshold: Similarity threshold.
+        """
+        self._max_distance = min(int((1 - threshold) * _BITS), _BITS - 1)
+
+        # Signatures within the distance are equal in at least one band
+        self._bands = _split_bands(self._max_distance + 1)
+
+        # Band -> Band value -> Signature-key pairs
+        self._buckets: List[Dict[int, List[Tuple[int, K]]]] = [{} for _ in self._bands]
+
+    def match_or_add(self, key: K, signature: int) -> Optional[K]:
+        """
+        Find a signature within the distance. Add the signature otherwise.
+
+        :param key: Key of the signature.
+        :param signature: 64-bit signature.
+        :return: Key of the matched signature if found; None otherwise.
+        """
+        values = [(signature >> shift) & mask for shift, mask in self._bands]
+
+        known = False
+
+        for bucket, value in zip(self._buckets, values, strict=True):
+            for other, other_key in bucket.get(value, ()):
+                if (signature ^ other).bit_count() > self._max_distance:
+                    continue
+
+                # A key seen again is never a duplicate of itself
+                if other_key == key:
+                    known = True
+                    continue
+
+                return other_key
+
+        if not known:
+            for bucket, value in zip(self._buckets, values, strict=True):
+                bucket.setdefault(value, []).append((signature, key))
+
+        return None
+
+
+def _split_bands(count: int) -> List[Tuple[int, int]]:
+    """
+    Split signature bits into bands of nearly equal width.
+
+    :param count: Number of bands.
+    :return: Shift and mask of each band.
+    """
+    bands = []
+    shift = 0
+
+    for i in range(count):
+        width = _BITS // count + (i < _BITS % count)
+        bands.append((shift, (1 << width) - 1))
+        shift += width
+
+    return bands
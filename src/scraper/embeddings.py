@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.hash import generate_sha
+
+__all__ = ("EmbeddingCache",)
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        path: str,
+        *,
+        model: str,
+        dimension: int,
+        capacity: int = 1024,
+    ) -> None:
+        """
+        :param path: Path to store the cache.
+        :param model: Name of the model that produced the embeddings.
+        :param dimension: Embedding dimension.
+        :param capacity: Initial number of rows to allocate.
+        """
+        # Embeddings of different models are never mixed up
+        self._path = os.path.join(path, generate_sha(model))
+
+        self._dimension = dimension
+
+        self._vectors_filename = os.path.join(self._path, "vectors.f32")
+        self._index_filename = os.path.join(self._path, "index.json")
+
+        # Create a cache directory if it does not already exist
+        os.makedirs(self._path, exist_ok=True)
+
+        # Sentence hash -> Row
+        self._index: Dict[str, int] = self._load_index()
+
+        self._vectors: Optional[np.memmap] = None
+        self._open_vectors(max(capacity, len(self._index), 1))
+
+        # Pages are indexed in executor threads, which may still be storing
+        # embeddings while the event loop flushes
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> EmbeddingCache:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(self, tokens: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for specified tokens.
+
+        :param tokens: Sequence of tokens.
+        :return: Embedding for each token if cached; None otherwise.
+        """
+        keys = [generate_sha(token) for token in tokens]
+
+        with self._lock:
+            assert self._vectors is not None
+
+            rows = [self._index.get(key) for key in keys]
+
+            return [
+                None if row is None else np.array(self._vectors[row]) for row in rows
+            ]
+
+    def store(self, tokens: Sequence[str], embeddings: np.ndarray) -> None:
+        """
+        Store embeddings for specified tokens.
+
+        :param tokens: Sequence of tokens.
+        :param embeddings: Array of embeddings, one row per token.
+        """
+        keys = [generate_sha(token) for token in tokens]
+
+        with self._lock:
+            for key, embedding in zip(keys, embeddings, strict=True):
+                if key in self._index:
+                    continue
+
+                row = len(self._index)
+                self._reserve(row + 1)
+
+                assert self._vectors is not None
+                self._vectors[row] = embedding
+
+                self._index[key] = row
+
+    def flush(self) -> None:
+        """
+        Persist the cached embeddings and the hash-to-row index to disk.
+        """
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+            # Write the index atomically so that a crash never leaves it
+            # half-done
+            tmp_filename = self._index_filename + ".tmp"
+            with open(tmp_filename, "w") as file:
+                json.dump(self._index, file)
+            os.replace(tmp_filename, self._index_filename)
+
+    def _load_index(self) -> Dict[str, int]:
+        """
+        Load the hash-to-row index from disk.
+
+        :return: Hash-to-row index; empty if the cache is new.
+        """
+        try:
+            with open(self._index_filename, "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _open_vectors(self, capacity: int) -> None:
+        """
+        Memory-map the embedding array, growing the file to the capacity.
+
+        :param capacity: Number of rows to map.
+        """
+        size = capacity * self._dimension * np.dtype(np.float32).itemsize
+
+        # Extend the file in place; rows already written are preserved
+        with open(self._vectors_filename, "ab") as file:
+            if file.tell() < size:
+                file.truncate(size)
+
+        self._vectors = np.memmap(
+            self._vectors_filename,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self._dimension),
+        )
+
+    def _reserve(self, rows: int) -> None:
+        """
+        Make sure the embedding array can hold the specified number of rows.
+
+        :param rows: Required number of rows.
+        """
+        assert self._vectors is not None
+
+        capacity = self._vectors.shape[0]
+
+        if rows <= capacity:
+            return
+
+        while capacity < rows:
+            capacity *= 2
+
+        self._vectors.flush()
+        self._vectors = None
+
+        self._open_vectors(capacity)
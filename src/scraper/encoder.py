@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import os
+import shutil
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from faiss import IndexFlatL2
+from sentence_transformers import SentenceTransformer
+from sklearn.metrics.pairwise import paired_cosine_distances
+
+from src.utils.hash import generate_sha
+
+__all__ = (
+    "AbstractEncoder",
+    "TorchEncoder",
+    "OnnxEncoder",
+    "EncoderAgreement",
+    "compare_encoders",
+)
+
+
+class AbstractEncoder(ABC):
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """
+        Get the name of the encoder. Encoders with equal names produce equal
+        embeddings.
+
+        :return: Name of the encoder.
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """
+        Get the embedding dimension of the encoder.
+
+        :return: Embedding dimension.
+        """
+        pass
+
+    @abstractmethod
+    def encode(self, tokens: List[str]) -> np.ndarray:
+        """
+        Embed tokens.
+
+        :param tokens: List of tokens.
+        :return: Array of embeddings.
+        """
+        pass
+
+
+class TorchEncoder(AbstractEncoder):
+    def __init__(self, model: str) -> None:
+        """
+        :param model: Name of the sentence transformer model.
+        """
+        self._name = model
+        self._model = SentenceTransformer(model)
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the encoder.
+
+        :return: Name of the encoder.
+        """
+        return self._name
+
+    @property
+    def dimension(self) -> int:
+        """
+        Get the embedding dimension of the encoder.
+
+        :return: Embedding dimension.
+        """
+        return _get_dimension(self._model)
+
+    def encode(self, tokens: List[str]) -> np.ndarray:
+        """
+        Embed tokens using eager PyTorch.
+
+        :param tokens: List of tokens.
+        :return: Array of embeddings.
+        """
+        return self._model.encode(tokens)
+
+
+class OnnxEncoder(AbstractEncoder):
+    def __init__(
+        self,
+        model: str,
+        *,
+        path: str,
+        quantize: bool = False,
+        quantization_config: str = "avx2",
+        threads: Optional[int] = None,
+    ) -> None:
+        """
+        :param model: Name of the sentence transformer model.
+        :param path: Path to store the exported ONNX models.
+        :param quantize: Whether to apply int8 dynamic quantization.
+        :param quantization_config: Target instruction set of the quantized
+            model: "arm64", "avx2", "avx512" or "avx512_vnni".
+        :param threads: Number of intra-op threads; ONNX Runtime picks the
+            number of physical cores if None.
+        """
+        onnxruntime = _import_onnxruntime()
+
+        self._name = f"{model}:onnx"
+        if quantize:
+            self._name += f":qint8-{quantization_config}"
+
+        # Export once; later runs load the model straight from disk
+        export_path = os.path.join(path, generate_sha(self._name))
+
+        session_options = onnxruntime.SessionOptions()
+        if threads is not None:
+            session_options.intra_op_num_threads = threads
+
+        model_kwargs: Dict[str, Any] = {
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options,
+        }
+
+        if quantize:
+            model_kwargs["file_name"] = "onnx/model_qint8.onnx"
+
+        if not os.path.exists(export_path):
+            _export_onnx_model(model, export_path, quantize, quantization_config)
+
+        self._model = SentenceTransformer(
+            export_path, backend="onnx", model_kwargs=model_kwargs
+        )
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the encoder.
+
+        :return: Name of the encoder.
+        """
+        return self._name
+
+    @property
+    def dimension(self) -> int:
+        """
+        Get the embedding dimension of the encoder.
+
+        :return: Embedding dimension.
+        """
+        return _get_dimension(self._model)
+
+    def encode(self, tokens: List[str]) -> np.ndarray:
+        """
+        Embed tokens using ONNX Runtime.
+
+        :param tokens: List of tokens.
+        :return: Array of embeddings.
+        """
+        return self._model.encode(tokens)
+
+
+@dataclass
+class EncoderAgreement:
+    cosine_mean: float
+    """Mean cosine similarity of paired embeddings."""
+    cosine_min: float
+    """Minimum cosine similarity of paired embeddings."""
+    overlap: float
+    """Mean Jaccard similarity of the top-k corpus matches of both encoders."""
+
+
+def compare_encoders(
+    reference: AbstractEncoder,
+    candidate: AbstractEncoder,
+    corpus: List[str],
+    queries: List[str],
+    *,
+    k: int = 10,
+) -> EncoderAgreement:
+    """
+    Measure how closely the candidate encoder agrees with the reference one.
+
+    :param reference: Reference encoder, e.g. eager PyTorch.
+    :param candidate: Candidate encoder, e.g. quantized ONNX Runtime.
+    :param corpus: Tokens to embed and search over.
+    :param queries: Queries to search for.
+    :param k: Top-k matches.
+    :return: Agreement of the encoders.
+    """
+    reference_corpus = reference.encode(corpus)
+    candidate_corpus = candidate.encode(corpus)
+
+    similarities = 1 - paired_cosine_distances(reference_corpus, candidate_corpus)
+
+    reference_matches = _search(reference_corpus, reference.encode(queries), k)
+    candidate_matches = _search(candidate_corpus, candidate.encode(queries), k)
+
+    overlaps = [
+        len(a & b) / len(a | b) if a | b else 1.0
+        for a, b in zip(reference_matches, candidate_matches, strict=True)
+    ]
+
+    return EncoderAgreement(
+        cosine_mean=float(np.mean(similarities)),
+        cosine_min=float(np.min(similarities)),
+        overlap=float(np.mean(overlaps)) if overlaps else 1.0,
+    )
+
+
+def _search(corpus: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """
+    Search the corpus the same way the indexer does.
+
+    :param corpus: Corpus embeddings.
+    :param queries: Query embeddings.
+    :param k: Top-k matches.
+    :return: Set of matched corpus rows for each query.
+    """
+    index = IndexFlatL2(corpus.shape[1])
+    index.add(corpus)  # type: ignore
+
+    _, indices = index.search(queries, k)  # type: ignore
+
+    return [set(int(i) for i in row if i != -1) for row in indices]
+
+
+def _get_dimension(model: SentenceTransformer) -> int:
+    """
+    Get the embedding dimension of the sentence transformer model.
+
+    :param model: Sentence transformer model.
+    :return: Embedding dimension.
+    """
+    dimension = model.get_sentence_embedding_dimension()
+    if dimension is None:
+        raise ValueError("Model has no fixed embedding dimension")
+
+    return dimension
+
+
+def _import_onnxruntime() -> Any:
+    """
+    Import ONNX Runtime along with the Optimum integration the ONNX backend of
+    sentence transformers relies on.
+
+    :return: ONNX Runtime module.
+    """
+    try:
+        import onnxruntime
+        import optimum.onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "ONNX encoder backend requires `optimum[onnxruntime]`; "
+            "install it with `poetry install --with onnx`"
+        ) from e
+
+    return onnxruntime
+
+
+def _export_onnx_model(
+    model: str, path: str, quantize: bool, quantization_config: str
+) -> None:
+    """
+    Export the sentence transformer model to ONNX.
+
+    :param model: Name of the sentence transformer model.
+    :param path: Path to save the exported model.
+    :param quantize: Whether to apply int8 dynamic quantization.
+    :param quantization_config: Target instruction set of the quantized model.
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    # Export into a temporary directory so that a crash never leaves a
+    # half-exported model behind
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    onnx_model = SentenceTransformer(model, backend="onnx")
+    onnx_model.save_pretrained(tmp_path)
+
+    if quantize:
+        export_dynamic_quantized_onnx_model(
+            onnx_model, quantization_config, tmp_path, file_suffix="qint8"
+        )
+
+    os.replace(tmp_path, path)
@@ -3,19 +3,25 @@ from __future__ import annotations
 import asyncio
 from contextlib import suppress
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 import aiohttp
 from yarl import URL
 
 from src.utils.date import is_date_past
 from src.utils.hash import generate_sha
+from src.utils.href import normalize_href
+from src.utils.html import extract_canonical
 
 from .cache import AbstractCache
+from .canonicalizer import Canonicalizer
 from .types import PageMeta
 
 __all__ = ("Fetcher",)
 
+# Weight of the latest refresh in the page change rate
+CHANGE_RATE_WEIGHT = 0.25
+
 
 class Fetcher:
     def __init__(
@@ -26,6 +32,7 @@ class Fetcher:
         *,
         cache_map: Optional[AbstractCache] = None,
         cache_ttl: Optional[timedelta] = None,
+        canonicalizer: Optional[Canonicalizer] = None,
     ) -> None:
         """
         :param session: Client session.
@@ -33,10 +40,13 @@ class Fetcher:
         :param cache: Whether to cache fetched pages.
         :param cache_map: Cache map.
         :param cache_ttl: Cache TTL.
+        :param canonicalizer: URL canonicalizer. Learns aliases from redirects
+            and canonical links.
         """
         self._session = session
         self._timeout = timeout
         self._cache = cache
+        self._canonicalizer = canonicalizer
 
         if cache:
             if cache_map is None:
@@ -54,30 +64,81 @@ class Fetcher:
         :param url: URL of the page.
         :return: Page content if page exists; None otherwise.
         """
+        if self._canonicalizer is not None:
+            url = self._canonicalizer(url)
+
         if not self._cache:
-            return await self._fetch_page(url)
+            page, _ = await self._fetch_page(url)
+            return page
 
         meta = await self._cache_map.get_meta(url)
 
         if meta is None or is_date_past(meta.exp):
             return await self._cache_page(url, meta)
 
+        if self._canonicalizer is not None and meta.canonical is not None:
+            self._canonicalizer.learn(url, URL(str(meta.canonical)))
+
         if meta.sha is None:
             return None
 
         return await self._cache_map.get_page(url)
 
-    async def _fetch_page(self, url: URL) -> Optional[str]:
+    async def get_meta(self, url: URL) -> Optional[PageMeta]:
+        """
+        Get cached metadata of the page at specified URL without fetching it.
+
+        :param url: URL of the page.
+        :return: Page metadata if cached; None otherwise.
+        """
+        if not self._cache:
+            return None
+
+        if self._canonicalizer is not None:
+            url = self._canonicalizer(url)
+
+        return await self._cache_map.get_meta(url)
+
+    async def _fetch_page(self, url: URL) -> Tuple[Optional[str], URL]:
         """
         Fetch URL and return the page content.
 
         :param url: URL of the page.
-        :return: Page content if page exists; None otherwise.
+        :return: Page content if page exists, None otherwise; and URL of the
+            page after redirects.
         """
         with suppress(asyncio.TimeoutError):
             async with self._session.get(url, timeout=self._timeout) as res:
-                if _should_continue_fetching(res):
-                    return await res.text()
+                if not _should_continue_fetching(res):
+                    self._learn_canonical(url, res.url, None)
+                    return None, res.url
+
+                page = await res.text()
+                self._learn_canonical(url, res.url, page)
+
+                return page, res.url
+
+        return None, url
+
+    def _learn_canonical(self, url: URL, res_url: URL, page: Optional[str]) -> None:
+        """
+        Teach the canonicalizer about redirects and canonical links.
+
+        :param url: Requested URL of the page.
+        :param res_url: URL of the page after redirects.
+        :param page: Page content if page exists; None otherwise.
+        """
+        if self._canonicalizer is None:
+            return
+
+        if self._canonicalizer.follow_redirects:
+            self._canonicalizer.learn(url, res_url)
+
+        if self._canonicalizer.follow_canonical and page is not None:
+            href = extract_canonical(page)
+
+            if href is not None:
+                self._canonicalizer.learn(url, normalize_href(href, res_url))
 
     async def _cache_page(
         self, url: URL, last_meta: Optional[PageMeta]
@@ -89,22 +150,66 @@ class Fetcher:
         :param last_meta: Last metadata.
         :return: Page content if page exists; None otherwise.
         """
-        page = await self._fetch_page(url)
+        page, res_url = await self._fetch_page(url)
+
+        await self._record_page(url, page, last_meta)
 
+        # The request was redirected to the canonical page, so the response
+        # is the canonical page itself. Cache it under the canonical URL as
+        # well unless it is cached already, so that crawling the canonical URL
+        # needs no second fetch.
+        if self._is_redirect_to_canonical(url, res_url):
+            canonical = self._canonicalizer(url)  # type: ignore
+            canonical_meta = await self._cache_map.get_meta(canonical)
+
+            if canonical_meta is None or is_date_past(canonical_meta.exp):
+                await self._record_page(canonical, page, canonical_meta)
+
+        return page
+
+    def _is_redirect_to_canonical(self, url: URL, res_url: URL) -> bool:
+        """
+        Check if the request was redirected to the canonical page.
+
+        :param url: Requested URL of the page.
+        :param res_url: URL of the page after redirects.
+        :return: True if the response is the canonical page; False otherwise.
+        """
+        if self._canonicalizer is None or res_url == url:
+            return False
+
+        canonical = self._canonicalizer(url)
+
+        return canonical != url and canonical == self._canonicalizer(res_url)
+
+    async def _record_page(
+        self, url: URL, page: Optional[str], last_meta: Optional[PageMeta]
+    ) -> None:
+        """
+        Build metadata of the fetched page and cache the result.
+
+        :param url: URL of the page.
+        :param page: Page content.
+        :param last_meta: Last metadata.
+        """
         sha = None if page is None else generate_sha(page)
         now = datetime.now(timezone.utc)
 
+        canonical = None
+        if self._canonicalizer is not None and self._canonicalizer(url) != url:
+            canonical = self._canonicalizer(url).human_repr()
+
         next_meta = PageMeta(
             url=url.human_repr(),  # type: ignore
             sha=sha,
             exp=now + self._cache_ttl,
             iat=now,
+            canonical=canonical,  # type: ignore
+            change_rate=_update_change_rate(last_meta, sha),
         )
 
         await self._store_page(url, page, last_meta, next_meta)
 
-        return page
-
     async def _store_page(
         self,
         url: URL,
@@ -160,3 +265,21 @@ def _should_set_meta_only(last_meta: Optional[PageMeta], next_meta: PageMeta) ->
         return next_meta.sha is None
 
     return last_meta.sha == next_meta.sha
+
+
+def _update_change_rate(last_meta: Optional[PageMeta], sha: Optional[str]) -> float:
+    """
+    Update the moving average of the page change rate with the latest refresh.
+
+    :param last_meta: Last metadata.
+    :param sha: Hash of the latest page content.
+    :return: Next change rate.
+    """
+    if last_meta is None:
+        return 0.0
+
+    changed = float(last_meta.sha != sha)
+
+    return last_meta.change_rate + CHANGE_RATE_WEIGHT * (
+        changed - last_meta.change_rate
+    )
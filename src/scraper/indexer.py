@@ -1,25 +1,67 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Literal, Optional, Tuple
 
 import numpy as np
 from faiss import IndexFlatL2
-from sentence_transformers import SentenceTransformer
 from yarl import URL
 
 from .chunker import Chunker
+from .dedup import Deduplicator, DedupStats
+from .embeddings import EmbeddingCache
+from .encoder import AbstractEncoder
+from .lexicon import LexicalIndex
+
+# Rank offset of reciprocal-rank fusion
+RRF_K = 60
 
 
 class Indexer:
     def __init__(
-        self, model: SentenceTransformer, *, dimension: int, threshold: float
+        self,
+        encoder: AbstractEncoder,
+        *,
+        dimension: int,
+        threshold: float,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        dedup: bool = False,
+        dedup_page_threshold: float = 0.95,
+        dedup_chunk_threshold: float = 0.95,
+        dedup_shingle_size: int = 3,
+        lexicon: Optional[LexicalIndex[URL]] = None,
+        lexical_margin: float = 2.0,
     ) -> None:
         """
-        :param model: Sentence transformer model.
+        :param encoder: Sentence encoder.
         :param dimension: Embedding dimension.
         :param threshold: Similarity threshold.
+        :param embedding_cache: Sentence embedding cache.
+        :param dedup: Whether to skip near-duplicate pages and chunks.
+        :param dedup_page_threshold: Similarity threshold of near-duplicate
+            pages.
+        :param dedup_chunk_threshold: Similarity threshold of near-duplicate
+            chunks.
+        :param dedup_shingle_size: Number of words in a shingle.
+        :param lexicon: Lexical index of pages. Required for lexical and
+            hybrid search.
+        :param lexical_margin: How many times the best lexical score must
+            exceed the runner-up to skip the encoder in hybrid search.
         """
-        self._model = model
+        self._encoder = encoder
+        self._embedding_cache = embedding_cache
+
+        # Chunks are keyed by rows of this index, so the detector is never
+        # shared with another indexer
+        self._deduplicator: Optional[Deduplicator] = None
+        if dedup:
+            self._deduplicator = Deduplicator(
+                page_threshold=dedup_page_threshold,
+                chunk_threshold=dedup_chunk_threshold,
+                shingle_size=dedup_shingle_size,
+            )
+
+        self._lexicon = lexicon
+        self._lexical_margin = lexical_margin
 
         self._dimension = dimension
         self._threshold = threshold
@@ -29,45 +71,219 @@ class Indexer:
 
         self._pages: Dict[URL, str] = {}
 
-    def append(self, url: URL, page: str, tokens: List[str]) -> None:
+        # Near-duplicate URL -> Canonical URL
+        self._aliases: Dict[URL, URL] = {}
+        # Row -> URLs of pages with a near-duplicate of the chunk
+        self._mirrors: Dict[int, List[URL]] = {}
+
+    @property
+    def dedup_stats(self) -> Optional[DedupStats]:
+        """
+        Get deduplication statistics.
+
+        :return: Deduplication statistics if deduplication is enabled; None
+            otherwise.
+        """
+        if self._deduplicator is None:
+            return None
+
+        return self._deduplicator.stats
+
+    @property
+    def aliases(self) -> Dict[URL, URL]:
+        """
+        Get pages skipped as near-duplicates.
+
+        :return: Mapping of near-duplicate URLs to canonical URLs.
+        """
+        return self._aliases
+
+    @property
+    def mirrors(self) -> Dict[URL, List[URL]]:
+        """
+        Get pages whose chunks were skipped as near-duplicates.
+
+        :return: Mapping of URLs holding canonical chunks to URLs of pages
+            with near-duplicates of those chunks.
+        """
+        mirrors: Dict[URL, List[URL]] = {}
+
+        for row, urls in self._mirrors.items():
+            mirrors.setdefault(self._table[row], []).extend(urls)
+
+        return mirrors
+
+    def append(
+        self, url: URL, page: str, tokens: List[str], title: Optional[str] = None
+    ) -> None:
         """
         Append a page to the index.
 
         :param url: URL of the page.
         :param page: Content of the page.
         :param tokens: List of tokens.
+        :param title: Title of the page.
         """
+        if self._deduplicator is not None:
+            canonical = self._deduplicator.check_page(url, page)
+
+            if canonical is not None:
+                self._aliases[url] = canonical
+                return
+
+        if self._lexicon is not None:
+            self._lexicon.append(url, tokens, title)
+
         embeddings = self._embed_tokens(tokens)
         pairs = list(zip(tokens, embeddings))
 
         chunker = Chunker(pairs, dimension=self._dimension, threshold=self._threshold)
 
-        for _, embedding in chunker:
+        for chunk, embedding in chunker:
+            row = len(self._table)
+
+            if self._deduplicator is not None:
+                canonical_row = self._deduplicator.check_chunk(row, chunk)
+
+                if canonical_row is not None:
+                    self._mirrors.setdefault(canonical_row, []).append(url)
+                    continue
+
             self._index.add(embedding.reshape(1, -1))  # type: ignore
             self._table.append(url)
 
         self._pages[url] = page
 
-    def search(self, query: str, k: int) -> List[Tuple[URL, str]]:
+    def search(
+        self,
+        query: str,
+        k: int,
+        *,
+        mode: Literal["dense", "lexical", "hybrid"] = "dense",
+    ) -> List[Tuple[URL, str]]:
         """
         Search for similar pages based on the query.
 
         :param query: Query string.
         :param k: Top-k matches.
+        :param mode: Search mode. Dense search embeds the query; lexical search
+            ranks pages with BM25; hybrid search fuses both rankings, but
+            answers from the lexical index alone when it is confident.
         :return: List of URLs and their corresponding pages.
         """
-        embeddings = self._embed_tokens([query])
+        if mode == "dense":
+            urls = self._search_dense(query, k)
+        elif mode == "lexical":
+            urls = [url for url, _ in self._search_lexical(query, k)]
+        else:
+            urls = self._search_hybrid(query, k)
+
+        return [(url, self._pages[url]) for url in urls]
+
+    def _search_dense(self, query: str, k: int) -> List[URL]:
+        """
+        Search for pages with chunks closest to the query embedding.
+
+        :param query: Query string.
+        :param k: Top-k matches.
+        :return: List of URLs, best first.
+        """
+        embeddings = self._encoder.encode([query])
 
         _, indices = self._index.search(embeddings.reshape(1, -1), k)  # type: ignore
-        urls = set(self._table[i] for i in indices[0] if i != -1)
 
-        return [(url, self._pages[url]) for url in urls]
+        return list(dict.fromkeys(self._table[i] for i in indices[0] if i != -1))
+
+    def _search_lexical(self, query: str, k: int) -> List[Tuple[URL, float]]:
+        """
+        Search for pages matching the query words.
+
+        :param query: Query string.
+        :param k: Top-k matches.
+        :return: List of URLs and their BM25 scores, best first.
+        """
+        if self._lexicon is None:
+            raise ValueError("Lexicon required for lexical search")
+
+        return self._lexicon.search(query, k)
+
+    def _search_hybrid(self, query: str, k: int) -> List[URL]:
+        """
+        Fuse dense and lexical rankings with reciprocal-rank fusion. Skip the
+        encoder if the best lexical match clearly stands out.
+
+        :param query: Query string.
+        :param k: Top-k matches.
+        :return: List of URLs, best first.
+        """
+        # The margin test needs the runner-up even if a single page is asked
+        lexical = self._search_lexical(query, max(k, 2))
+
+        covered = self._lexicon.covers(query)  # type: ignore
+
+        if _is_lexical_confident(lexical, self._lexical_margin, covered):
+            return [url for url, _ in lexical[:k]]
+
+        scores: Dict[URL, float] = {}
+
+        rankings = [self._search_dense(query, k), [url for url, _ in lexical]]
+        for ranking in rankings:
+            for rank, url in enumerate(ranking, start=1):
+                scores[url] = scores.get(url, 0.0) + 1 / (RRF_K + rank)
+
+        return sorted(scores, key=scores.__getitem__, reverse=True)[:k]
 
     def _embed_tokens(self, tokens: List[str]) -> np.ndarray:
         """
-        Embed tokens using the sentence transformer model.
+        Embed tokens using the sentence encoder. Only tokens that are
+        missing from the embedding cache are encoded.
 
         :param tokens: List of tokens.
         :return: Array of embeddings.
         """
-        return self._model.encode(tokens)
+        if self._embedding_cache is None or not tokens:
+            return self._encoder.encode(tokens)
+
+        embeddings = self._embedding_cache.lookup(tokens)
+
+        # Encode each unseen token once, even if it repeats within the page
+        missing = list(
+            dict.fromkeys(
+                t for t, e in zip(tokens, embeddings, strict=True) if e is None
+            )
+        )
+
+        if missing:
+            encoded = self._encoder.encode(missing)
+            self._embedding_cache.store(missing, encoded)
+
+            lookup = dict(zip(missing, encoded, strict=True))
+            embeddings = [
+                lookup[token] if embedding is None else embedding
+                for token, embedding in zip(tokens, embeddings, strict=True)
+            ]
+
+        return np.stack(embeddings)  # type: ignore
+
+
+def _is_lexical_confident(
+    matches: List[Tuple[URL, float]], margin: float, covered: bool
+) -> bool:
+    """
+    Check if the best lexical match clearly stands out. A lone match has no
+    runner-up to stand out from; it is trusted only if it holds every query
+    word.
+
+    :param matches: List of URLs and their scores, best first.
+    :param margin: Required ratio of the best score to the runner-up.
+    :param covered: Whether every query word occurs in the lexicon. With a
+        lone match, every query word then occurs in that page.
+    :return: True if the lexical matches can be trusted alone; False
+        otherwise.
+    """
+    if not matches:
+        return False
+    if len(matches) == 1:
+        return covered
+
+    return matches[0][1] >= margin * matches[1][1]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from src.utils.text import split_words
+
+__all__ = ("LexicalIndex",)
+
+K = TypeVar("K", bound=Hashable)
+
+
+class LexicalIndex(Generic[K]):
+    def __init__(
+        self, *, k1: float = 1.5, b: float = 0.75, title_boost: int = 3
+    ) -> None:
+        """
+        :param k1: BM25 term frequency saturation.
+        :param b: BM25 document length normalization.
+        :param title_boost: How many times title words count as body words.
+        """
+        self._k1 = k1
+        self._b = b
+        self._title_boost = title_boost
+
+        self._keys: List[K] = []  # Lookup table for documents
+        self._vocabulary: Dict[str, int] = {}  # Word -> Term
+
+        # Postings in insertion order
+        self._terms = array("i")
+        self._docs = array("i")
+        self._freqs = array("H")
+
+        self._lengths = array("f")
+
+        # Postings grouped by term, compiled lazily on search
+        self._offsets: Optional[np.ndarray] = None
+        self._posting_docs = np.empty(0, dtype=np.int32)
+        self._posting_freqs = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def append(self, key: K, tokens: List[str], title: Optional[str] = None) -> None:
+        """
+        Append a document to the index.
+
+        :param key: Key of the document.
+        :param tokens: List of tokens.
+        :param title: Title of the document.
+        """
+        counts = Counter(word for token in tokens for word in split_words(token))
+
+        if title is not None:
+            for word in split_words(title):
+                counts[word] += self._title_boost
+
+        doc = len(self._keys)
+        self._keys.append(key)
+
+        for word, count in counts.items():
+            term = self._vocabulary.setdefault(word, len(self._vocabulary))
+
+            self._terms.append(term)
+            self._docs.append(doc)
+            self._freqs.append(min(count, 0xFFFF))
+
+        self._lengths.append(sum(counts.values()))
+
+        self._offsets = None
+
+    def covers(self, query: str) -> bool:
+        """
+        Check if every word of the query occurs in some document.
+
+        :param query: Query string.
+        :return: True if every query word is indexed; False otherwise.
+        """
+        words = split_words(query)
+
+        return bool(words) and all(word in self._vocabulary for word in words)
+
+    def search(self, query: str, k: int) -> List[Tuple[K, float]]:
+        """
+        Search for documents matching the query with BM25.
+
+        :param query: Query string.
+        :param k: Top-k matches.
+        :return: List of keys and their scores, best first.
+        """
+        terms = set(
+            self._vocabulary[word]
+            for word in split_words(query)
+            if word in self._vocabulary
+        )
+
+        if not terms:
+            return []
+
+        offsets = self._compile()
+
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)
+        n = len(self._keys)
+
+        scores = np.zeros(n, dtype=np.float32)
+        avg_length = lengths.mean() or 1.0
+        norms = self._k1 * (1 - self._b + self._b * lengths / avg_length)
+
+        for term in terms:
+            start, end = offsets[term], offsets[term + 1]
+
+            docs = self._posting_docs[start:end]
+            freqs = self._posting_freqs[start:end]
+
+            idf = np.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * freqs * (self._k1 + 1) / (freqs + norms[docs])
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(self._keys[i], float(scores[i])) for i in top]
+
+    def _compile(self) -> np.ndarray:
+        """
+        Group postings by term into compact arrays.
+
+        :return: Offsets of each term's postings.
+        """
+        if self._offsets is not None:
+            return self._offsets
+
+        terms = np.frombuffer(self._terms, dtype=np.int32)
+        order = np.argsort(terms, kind="stable")
+
+        self._posting_docs = np.frombuffer(self._docs, dtype=np.int32)[order]
+        self._posting_freqs = np.frombuffer(self._freqs, dtype=np.uint16)[order].astype(
+            np.float32
+        )
+
+        counts = np.bincount(terms, minlength=len(self._vocabulary))
+
+        self._offsets = np.zeros(len(self._vocabulary) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._offsets[1:])
+
+        return self._offsets
@@ -1,5 +1,6 @@
 import asyncio
-from typing import Optional, Set
+from datetime import timedelta
+from typing import AsyncIterator, Optional
 
 import nltk
 from bs4 import BeautifulSoup
@@ -7,7 +8,8 @@ from html2text import HTML2Text
 from tqdm.asyncio import tqdm
 from yarl import URL
 
-from .crawler import Crawler
+from .canonicalizer import Canonicalizer
+from .crawler import Crawler, CrawlOrder
 from .fetcher import Fetcher
 from .indexer import Indexer
 
@@ -29,33 +31,64 @@ class Scraper:
         fetcher: Fetcher,
         indexer: Indexer,
         *,
+        canonicalizer: Optional[Canonicalizer] = None,
         loop: Optional[asyncio.AbstractEventLoop] = None,
     ) -> None:
         """
         :param fetcher: Page fetcher.
         :param indexer: Page indexer.
+        :param canonicalizer: URL canonicalizer.
         :param loop: Asynchronous event loop.
         """
         self._fetcher = fetcher
         self._indexer = indexer
+        self._canonicalizer = canonicalizer
 
         self._loop = loop or asyncio.get_event_loop()
 
-    async def crawl_page(
-        self, url: URL, *, host: Optional[str] = None, pbar: Optional[tqdm] = None
-    ) -> Set[URL]:
+    def crawl_page(
+        self,
+        url: URL,
+        *,
+        host: Optional[str] = None,
+        concurrency: int = 64,
+        bloom_capacity: Optional[int] = None,
+        order: CrawlOrder = "depth",
+        max_depth: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        budget: Optional[timedelta] = None,
+        pbar: Optional[tqdm] = None,
+    ) -> AsyncIterator[URL]:
         """
-        Crawl page at specified URL.
+        Crawl site starting at specified URL.
 
         :param url: URL of the page.
         :param host: Trusted host.
+        :param concurrency: Number of pages crawled at once.
+        :param bloom_capacity: Expected number of URLs of the Bloom filter in
+            front of the visited set. Skip the Bloom filter if None.
+        :param order: Order of the frontier: "depth", "expiry" or "change".
+        :param max_depth: Maximum number of links from the root to follow.
+        :param max_pages: Maximum number of pages to crawl.
+        :param budget: Wall-clock time after which no more pages are started.
         :param pbar: Progress bar.
+        :return: Yields crawled URLs.
         """
-        crawl = Crawler(self._fetcher, host=host, loop=self._loop, pbar=pbar)
-
-        await crawl(url)
-
-        return crawl.done
+        crawl = Crawler(
+            self._fetcher,
+            host=host,
+            canonicalizer=self._canonicalizer,
+            concurrency=concurrency,
+            bloom_capacity=bloom_capacity,
+            order=order,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            budget=budget,
+            loop=self._loop,
+            pbar=pbar,
+        )
+
+        return crawl(url)
 
     def index_page(self, url: URL, html: str) -> None:
         """
@@ -73,4 +106,7 @@ class Scraper:
         text = h.handle(str(tag))
         tokens = nltk.sent_tokenize(" ".join(tag.stripped_strings))
 
-        self._indexer.append(url, text, tokens)
+        heading = soup.find("h1", {"id": "firstHeading"}) or soup.title
+        title = heading.get_text(" ", strip=True) if heading else None
+
+        self._indexer.append(url, text, tokens, title)
@@ -17,6 +17,10 @@ class PageMeta(pydantic.BaseModel):
     """Expiry date."""
     iat: datetime
     """Creation date."""
+    canonical: Optional[pydantic.HttpUrl] = None
+    """Canonical URL of the page if it differs from `url`; None otherwise."""
+    change_rate: float = 0.0
+    """Moving average of how often refreshes find the page content changed."""
 
     def serialize(self) -> str:
         """Generates a JSON representation of the model."""
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import math
+from typing import List, Optional
+
+import numpy as np
+from yarl import URL
+
+from src.utils.hash import generate_fingerprint
+
+__all__ = ("VisitedSet",)
+
+
+class VisitedSet:
+    def __init__(
+        self,
+        capacity: int = 1024,
+        *,
+        bloom_capacity: Optional[int] = None,
+        bloom_error: float = 0.01,
+    ) -> None:
+        """
+        :param capacity: Initial number of URLs to allocate.
+        :param bloom_capacity: Expected number of URLs of the Bloom filter
+            front. Skip the Bloom filter if None.
+        :param bloom_error: False positive rate of the Bloom filter front.
+        """
+        # Open addressing with linear probing; zero marks an empty slot
+        self._slots = np.zeros(_next_power_of_two(capacity * 2), dtype=np.uint64)
+        self._size = 0
+
+        self._bloom = None
+        if bloom_capacity is not None:
+            self._bloom = _BloomFilter(bloom_capacity, bloom_error)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, url: URL) -> bool:
+        fingerprint = _fingerprint(url)
+
+        # Most new URLs are rejected by the Bloom filter without probing
+        if self._bloom is not None and fingerprint not in self._bloom:
+            return False
+
+        return self._slots[self._probe(fingerprint)] != 0
+
+    def add(self, url: URL) -> bool:
+        """
+        Add URL to the set.
+
+        :param url: URL of the page.
+        :return: True if the URL is new; False otherwise.
+        """
+        fingerprint = _fingerprint(url)
+
+        # A definite miss of the Bloom filter is new for sure, so it only
+        # needs an empty slot instead of a lookup
+        if self._bloom is not None and fingerprint not in self._bloom:
+            slot = self._find_empty(fingerprint)
+        else:
+            slot = self._probe(fingerprint)
+            if self._slots[slot] != 0:
+                return False
+
+        self._slots[slot] = fingerprint
+        self._size += 1
+
+        if self._bloom is not None:
+            self._bloom.add(fingerprint)
+
+        # Keep the load factor at most 1/2
+        if self._size * 2 > len(self._slots):
+            self._grow()
+
+        return True
+
+    def _probe(self, fingerprint: int) -> int:
+        """
+        Find the slot holding the fingerprint or the empty slot to put it in.
+
+        :param fingerprint: Non-zero 64-bit fingerprint.
+        :return: Slot index.
+        """
+        mask = len(self._slots) - 1
+        slot = fingerprint & mask
+
+        while True:
+            value = int(self._slots[slot])
+
+            if value == 0 or value == fingerprint:
+                return slot
+
+            slot = (slot + 1) & mask
+
+    def _find_empty(self, fingerprint: int) -> int:
+        """
+        Find the empty slot to put a fingerprint in that is not in the set.
+
+        :param fingerprint: Non-zero 64-bit fingerprint.
+        :return: Slot index.
+        """
+        mask = len(self._slots) - 1
+        slot = fingerprint & mask
+
+        while self._slots[slot] != 0:
+            slot = (slot + 1) & mask
+
+        return slot
+
+    def _grow(self) -> None:
+        """
+        Double the number of slots and rehash the fingerprints.
+        """
+        fingerprints = self._slots[self._slots != 0]
+
+        self._slots = np.zeros(len(self._slots) * 2, dtype=np.uint64)
+
+        for fingerprint in fingerprints.tolist():
+            self._slots[self._find_empty(fingerprint)] = fingerprint
+
+
+class _BloomFilter:
+    def __init__(self, capacity: int, error: float) -> None:
+        """
+        :param capacity: Expected number of items.
+        :param error: False positive rate at the expected number of items.
+        """
+        size = max(int(-capacity * math.log(error) / math.log(2) ** 2), 8)
+
+        self._size = size
+        self._hashes = max(round(size / capacity * math.log(2)), 1)
+
+        self._bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return all(
+            self._bits[bit >> 3] & (1 << (bit & 7))
+            for bit in self._bits_of(fingerprint)
+        )
+
+    def add(self, fingerprint: int) -> None:
+        """
+        Add fingerprint to the filter.
+
+        :param fingerprint: 64-bit fingerprint.
+        """
+        for bit in self._bits_of(fingerprint):
+            self._bits[bit >> 3] |= 1 << (bit & 7)
+
+    def _bits_of(self, fingerprint: int) -> List[int]:
+        """
+        Derive bit positions of the fingerprint with double hashing.
+
+        :param fingerprint: 64-bit fingerprint.
+        :return: Bit positions.
+        """
+        a, b = fingerprint & 0xFFFFFFFF, fingerprint >> 32 | 1
+
+        return [(a + i * b) % self._size for i in range(self._hashes)]
+
+
+def _fingerprint(url: URL) -> int:
+    """
+    Fingerprint URL. Zero is reserved for empty slots.
+
+    :param url: URL of the page.
+    :return: Non-zero 64-bit fingerprint.
+    """
+    return generate_fingerprint(url.human_repr()) or 1
+
+
+def _next_power_of_two(n: int) -> int:
+    """
+    Round up to the next power of two.
+
+    :param n: Positive number.
+    :return: Smallest power of two not less than the number.
+    """
+    return 1 << max(n - 1, 1).bit_length()
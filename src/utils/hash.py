@@ -1,6 +1,6 @@
-from hashlib import sha256
+from hashlib import blake2b, sha256
 
-__all__ = ("generate_sha",)
+__all__ = ("generate_sha", "generate_fingerprint")
 
 
 def generate_sha(string: str) -> str:
@@ -11,3 +11,13 @@ def generate_sha(string: str) -> str:
     :return: SHA-256 hash of the string.
     """
     return sha256(string.encode()).hexdigest()
+
+
+def generate_fingerprint(string: str) -> int:
+    """
+    Generate a 64-bit fingerprint from a string.
+
+    :param string: String to fingerprint.
+    :return: Unsigned 64-bit fingerprint of the string.
+    """
+    return int.from_bytes(blake2b(string.encode(), digest_size=8).digest(), "big")
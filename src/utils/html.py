@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from typing import Generator
+from typing import Generator, Optional
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from yarl import URL
 
-__all__ = ("extract_hrefs",)
+__all__ = ("extract_hrefs", "extract_canonical")
 
 
 def extract_hrefs(html: str) -> Generator[URL, None, None]:
@@ -19,3 +19,19 @@ def extract_hrefs(html: str) -> Generator[URL, None, None]:
 
     for tag in soup.find_all("a", href=True):
         yield URL(tag["href"])
+
+
+def extract_canonical(html: str) -> Optional[URL]:
+    """
+    Extract the canonical href from the HTML content.
+
+    :param html: HTML content.
+    :return: Href of `<link rel="canonical">` if present; None otherwise.
+    """
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("link"))
+
+    tag = soup.find("link", rel="canonical", href=True)
+    if tag is None:
+        return None
+
+    return URL(tag["href"])  # type: ignore
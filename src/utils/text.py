@@ -0,0 +1,16 @@
+import re
+from typing import List
+
+__all__ = ("split_words",)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def split_words(text: str) -> List[str]:
+    """
+    Split text into lowercase words.
+
+    :param text: Text to split.
+    :return: List of words.
+    """
+    return _WORD_PATTERN.findall(text.lower())
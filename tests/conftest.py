@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def aiolib() -> str:
+    # Run asynchronous tests on asyncio only
+    return "asyncio"
@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+from yarl import URL
+
+from src.scraper.encoder import AbstractEncoder
+from src.utils.hash import generate_fingerprint
+from src.utils.text import split_words
+
+DIMENSION = 16
+
+
+class FakeResponse:
+    def __init__(self, url: URL, body: Optional[str]) -> None:
+        self.url = url
+        self.status = 200 if body is not None else 404
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+
+        self._body = body
+
+    async def __aenter__(self) -> "FakeResponse":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+    async def text(self) -> str:
+        assert self._body is not None
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, site: Dict[str, Tuple[str, Optional[str]]]) -> None:
+        """
+        :param site: Requested URL -> Final URL after redirects and page body.
+        """
+        self.site = site
+        self.requests: List[URL] = []
+
+    def get(self, url: URL, **_) -> FakeResponse:
+        self.requests.append(url)
+
+        final_url, body = self.site.get(str(url), (str(url), None))
+
+        return FakeResponse(URL(final_url), body)
+
+
+@pytest.fixture
+def fake_session():
+    return FakeSession
+
+
+class FakeEncoder(AbstractEncoder):
+    """Bag-of-words encoder, so that similar tokens get similar embeddings."""
+
+    dimension = DIMENSION
+
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    def encode(self, tokens: List[str]) -> np.ndarray:
+        self.calls.append(list(tokens))
+
+        embeddings = np.zeros((len(tokens), DIMENSION), dtype=np.float32)
+        for row, token in enumerate(tokens):
+            for word in split_words(token):
+                embeddings[row, generate_fingerprint(word) % DIMENSION] += 1
+
+        return embeddings
+
+
+@pytest.fixture
+def encoder() -> FakeEncoder:
+    return FakeEncoder()
@@ -0,0 +1,243 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+from yarl import URL
+
+from src.scraper.cache import AbstractCache, WriteBehindCache
+from src.scraper.types import PageMeta
+
+URL_A = URL("https://x.org/a")
+URL_B = URL("https://x.org/b")
+
+
+class MemoryCache(AbstractCache):
+    """In-memory cache that records writes and can hold or fail them."""
+
+    def __init__(self) -> None:
+        self.metas: Dict[URL, PageMeta] = {}
+        self.pages: Dict[URL, str] = {}
+        self.writes: List[Tuple[str, URL]] = []
+
+        self.gate: Optional[asyncio.Event] = None
+        self.fail = False
+
+    async def set_meta(self, url: URL, meta: PageMeta) -> None:
+        await self._write("meta", url)
+        self.metas[url] = meta
+
+    async def get_meta(self, url: URL) -> Optional[PageMeta]:
+        return self.metas.get(url)
+
+    async def set_page(self, url: URL, page: str) -> None:
+        await self._write("page", url)
+        self.pages[url] = page
+
+    async def get_page(self, url: URL) -> str:
+        try:
+            return self.pages[url]
+        except KeyError:
+            raise FileNotFoundError(url.human_repr()) from None
+
+    async def delele_page(self, url: URL) -> None:
+        await self._write("delete", url)
+        if url not in self.pages:
+            raise FileNotFoundError(url.human_repr())
+        del self.pages[url]
+
+    async def _write(self, op: str, url: URL) -> None:
+        self.writes.append((op, url))
+
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise OSError("Disk is full")
+
+
+def build_meta(url: URL, sha: Optional[str] = "sha") -> PageMeta:
+    now = datetime.now(timezone.utc)
+    return PageMeta(
+        url=url.human_repr(),  # type: ignore
+        sha=sha,
+        exp=now + timedelta(hours=1),
+        iat=now,
+    )
+
+
+def build_cache(inner: MemoryCache, **kwargs) -> WriteBehindCache:
+    kwargs.setdefault("flush_interval", timedelta(hours=1))
+    return WriteBehindCache(inner, **kwargs)
+
+
+async def test_repeated_writes_coalesce():
+    inner = MemoryCache()
+    cache = build_cache(inner)
+
+    await cache.set_page(URL_A, "v1")
+    await cache.set_page(URL_A, "v2")
+    await cache.set_meta(URL_A, build_meta(URL_A, "v1"))
+    await cache.set_meta(URL_A, build_meta(URL_A, "v2"))
+
+    assert inner.writes == []
+
+    await cache.close()
+
+    # The page goes first so that metadata never points to a missing page
+    assert inner.writes == [("page", URL_A), ("meta", URL_A)]
+    assert inner.pages[URL_A] == "v2"
+    assert inner.metas[URL_A].sha == "v2"
+
+
+async def test_reads_see_pending_writes():
+    inner = MemoryCache()
+    cache = build_cache(inner)
+
+    await cache.set_meta(URL_A, build_meta(URL_A))
+    await cache.set_page(URL_A, "v1")
+
+    assert await cache.get_page(URL_A) == "v1"
+    assert (await cache.get_meta(URL_A)).sha == "sha"  # type: ignore
+
+    await cache.delele_page(URL_A)
+
+    with pytest.raises(FileNotFoundError):
+        await cache.get_page(URL_A)
+
+    await cache.close()
+
+
+async def test_reads_see_writes_of_inflight_flush():
+    inner = MemoryCache()
+    inner.gate = asyncio.Event()
+    cache = build_cache(inner)
+
+    await cache.set_page(URL_A, "v1")
+    await cache.set_page(URL_B, "v1")
+
+    flush = asyncio.ensure_future(cache.flush())
+    while not inner.writes:
+        await asyncio.sleep(0)
+
+    # The batch left the pending writes but has not reached the cache yet
+    assert inner.pages == {}
+    assert await cache.get_page(URL_A) == "v1"
+
+    # Newer writes take precedence over the batch in flight
+    await cache.set_page(URL_B, "v2")
+    assert await cache.get_page(URL_B) == "v2"
+
+    inner.gate.set()
+    await flush
+    await cache.close()
+
+    assert inner.pages == {URL_A: "v1", URL_B: "v2"}
+
+
+async def test_failed_flush_requeues_writes():
+    inner = MemoryCache()
+    inner.gate = asyncio.Event()
+    inner.fail = True
+    cache = build_cache(inner)
+
+    await cache.set_page(URL_A, "v1")
+    await cache.set_page(URL_B, "v1")
+
+    flush = asyncio.ensure_future(cache.flush())
+    while not inner.writes:
+        await asyncio.sleep(0)
+
+    await cache.set_page(URL_B, "v2")
+
+    inner.gate.set()
+    with pytest.raises(OSError):
+        await flush
+
+    # Failed writes stay readable and never overwrite newer ones
+    assert await cache.get_page(URL_A) == "v1"
+    assert await cache.get_page(URL_B) == "v2"
+
+    inner.fail = False
+    await cache.close()
+
+    assert inner.pages == {URL_A: "v1", URL_B: "v2"}
+
+
+async def test_close_flushes_pending_writes():
+    inner = MemoryCache()
+
+    async with build_cache(inner) as cache:
+        await cache.set_meta(URL_A, build_meta(URL_A))
+        await cache.set_page(URL_A, "v1")
+
+        assert inner.writes == []
+
+    assert inner.pages == {URL_A: "v1"}
+    assert URL_A in inner.metas
+
+
+async def test_full_batch_flushes_in_background():
+    inner = MemoryCache()
+    cache = build_cache(inner, batch_size=2)
+
+    await cache.set_page(URL_A, "v1")
+    await asyncio.sleep(0.01)
+    assert inner.pages == {}
+
+    await cache.set_page(URL_B, "v1")
+    await asyncio.sleep(0.01)
+    assert inner.pages == {URL_A: "v1", URL_B: "v1"}
+
+    await cache.close()
+
+
+async def test_flush_interval_flushes_in_background():
+    inner = MemoryCache()
+    cache = build_cache(inner, flush_interval=timedelta(milliseconds=10))
+
+    await cache.set_page(URL_A, "v1")
+    await asyncio.sleep(0.05)
+
+    assert inner.pages == {URL_A: "v1"}
+
+    await cache.close()
+
+
+async def test_close_retries_writes_of_failed_background_flush():
+    inner = MemoryCache()
+    inner.fail = True
+    cache = build_cache(inner, batch_size=1)
+
+    await cache.set_page(URL_A, "v1")
+    await asyncio.sleep(0.01)
+
+    # Nothing was lost, so the temporary error is not raised
+    inner.fail = False
+    await cache.close()
+
+    assert inner.pages == {URL_A: "v1"}
+
+
+async def test_close_raises_if_final_flush_fails():
+    inner = MemoryCache()
+    inner.fail = True
+    cache = build_cache(inner, batch_size=1)
+
+    await cache.set_page(URL_A, "v1")
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(OSError):
+        await cache.close()
+
+    assert await cache.get_page(URL_A) == "v1"
+
+
+async def test_deleting_unknown_page_is_not_an_error():
+    inner = MemoryCache()
+
+    async with build_cache(inner) as cache:
+        await cache.set_meta(URL_A, build_meta(URL_A, None))
+        await cache.delele_page(URL_A)
+
+    assert inner.writes == [("delete", URL_A), ("meta", URL_A)]
+    assert inner.pages == {}
@@ -0,0 +1,62 @@
+import pytest
+from yarl import URL
+
+from src.scraper.canonicalizer import Canonicalizer
+
+
+@pytest.mark.parametrize(
+    ("href", "expected"),
+    [
+        ("https://x.org/wiki/Page#History", "https://x.org/wiki/Page"),
+        ("HTTPS://X.ORG:443/wiki/Page", "https://x.org/wiki/Page"),
+        ("https://x.org/wiki/Page/", "https://x.org/wiki/Page"),
+        ("https://x.org/", "https://x.org/"),
+        ("https://x.org/wiki/%7EPage", "https://x.org/wiki/~Page"),
+        ("https://x.org/wiki/Caf%c3%a9", "https://x.org/wiki/Caf%C3%A9"),
+        ("https://x.org/wiki/A%2FB", "https://x.org/wiki/A%2FB"),
+        ("https://x.org/w?title=A&action=edit", "https://x.org/w?title=A"),
+        ("https://x.org/w?b=2&a=1", "https://x.org/w?a=1&b=2"),
+    ],
+)
+def test_normalizes_url(href, expected):
+    assert str(Canonicalizer()(URL(href))) == expected
+
+
+def test_keeps_reserved_escapes_apart():
+    canonicalize = Canonicalizer()
+
+    assert canonicalize(URL("https://x.org/wiki/A%2FB")) != canonicalize(
+        URL("https://x.org/wiki/A/B")
+    )
+
+
+def test_allowed_params_whitelist_query():
+    canonicalize = Canonicalizer(allowed_params={"title"})
+
+    assert str(canonicalize(URL("https://x.org/w?title=A&x=1"))) == (
+        "https://x.org/w?title=A"
+    )
+
+
+def test_learned_alias_resolves_to_target():
+    canonicalize = Canonicalizer()
+    canonicalize.learn(URL("https://x.org/a"), URL("https://x.org/b"))
+    canonicalize.learn(URL("https://x.org/b"), URL("https://x.org/c"))
+
+    assert str(canonicalize(URL("https://x.org/a#top"))) == "https://x.org/c"
+
+
+def test_learn_ignores_cycles():
+    canonicalize = Canonicalizer()
+    canonicalize.learn(URL("https://x.org/a"), URL("https://x.org/b"))
+    canonicalize.learn(URL("https://x.org/b"), URL("https://x.org/a"))
+
+    assert str(canonicalize(URL("https://x.org/a"))) == "https://x.org/b"
+    assert str(canonicalize(URL("https://x.org/b"))) == "https://x.org/b"
+
+
+def test_learn_ignores_other_hosts():
+    canonicalize = Canonicalizer()
+    canonicalize.learn(URL("https://x.org/a"), URL("https://www.x.org/a"))
+
+    assert str(canonicalize(URL("https://x.org/a"))) == "https://x.org/a"
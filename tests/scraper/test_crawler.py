@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from src.scraper.cache import Cache
+from src.scraper.canonicalizer import Canonicalizer
+from src.scraper.crawler import Crawler
+from src.scraper.fetcher import Fetcher
+from src.scraper.types import PageMeta
+
+
+def link(href: str) -> str:
+    return f'<a href="{href}">link</a>'
+
+
+def links(*hrefs: str) -> str:
+    return "".join(link(href) for href in hrefs)
+
+
+async def crawl(
+    session, root: str, cache: Optional[Cache] = None, **kwargs
+) -> List[str]:
+    canonicalizer = Canonicalizer()
+    fetcher = Fetcher(
+        session,
+        aiohttp.ClientTimeout(),
+        cache=cache is not None,
+        cache_map=cache,
+        cache_ttl=timedelta(hours=1),
+        canonicalizer=canonicalizer,
+    )
+    crawler = Crawler(fetcher, canonicalizer=canonicalizer, **kwargs)
+
+    return [str(url) async for url in crawler(URL(root))]
+
+
+async def test_crawls_linked_pages_once(fake_session):
+    session = fake_session(
+        {
+            "https://x.org/a": ("https://x.org/a", link("https://x.org/b#top")),
+            "https://x.org/b": ("https://x.org/b", link("https://x.org/a/")),
+        }
+    )
+
+    urls = await crawl(session, "https://x.org/a", host="x.org")
+
+    assert sorted(urls) == ["https://x.org/a", "https://x.org/b"]
+    assert len(session.requests) == 2
+
+
+async def test_alias_is_crawled_as_canonical_page(fake_session):
+    page = '<link rel="canonical" href="https://x.org/b">'
+    session = fake_session({"https://x.org/a": ("https://x.org/a", page)})
+
+    urls = await crawl(session, "https://x.org/a", host="x.org")
+
+    assert urls == ["https://x.org/b"]
+
+
+async def test_off_host_canonical_keeps_original_page(fake_session):
+    page = '<link rel="canonical" href="https://www.x.org/a">' + link("https://x.org/b")
+    session = fake_session(
+        {
+            "https://x.org/a": ("https://x.org/a", page),
+            "https://x.org/b": ("https://x.org/b", ""),
+        }
+    )
+
+    urls = await crawl(session, "https://x.org/a", host="x.org")
+
+    assert sorted(urls) == ["https://x.org/a", "https://x.org/b"]
+
+
+def tree_site(fake_session):
+    # a -> b, c; b -> d
+    return fake_session(
+        {
+            "https://x.org/a": (
+                "https://x.org/a",
+                links("https://x.org/b", "https://x.org/c"),
+            ),
+            "https://x.org/b": ("https://x.org/b", link("https://x.org/d")),
+            "https://x.org/c": ("https://x.org/c", ""),
+            "https://x.org/d": ("https://x.org/d", ""),
+        }
+    )
+
+
+async def test_depth_order_crawls_breadth_first(fake_session):
+    session = tree_site(fake_session)
+
+    urls = await crawl(session, "https://x.org/a", host="x.org", concurrency=1)
+
+    assert urls == [
+        "https://x.org/a",
+        "https://x.org/b",
+        "https://x.org/c",
+        "https://x.org/d",
+    ]
+
+
+async def test_max_depth(fake_session):
+    session = tree_site(fake_session)
+
+    urls = await crawl(session, "https://x.org/a", host="x.org", max_depth=1)
+
+    assert sorted(urls) == ["https://x.org/a", "https://x.org/b", "https://x.org/c"]
+
+
+async def test_max_pages(fake_session):
+    session = tree_site(fake_session)
+
+    urls = await crawl(
+        session, "https://x.org/a", host="x.org", concurrency=1, max_pages=2
+    )
+
+    assert urls == ["https://x.org/a", "https://x.org/b"]
+    assert len(session.requests) == 2
+
+
+async def test_exhausted_budget_starts_nothing(fake_session):
+    session = tree_site(fake_session)
+
+    urls = await crawl(session, "https://x.org/a", host="x.org", budget=timedelta())
+
+    assert urls == []
+    assert session.requests == []
+
+
+async def test_budget_allows_crawl(fake_session):
+    session = tree_site(fake_session)
+
+    urls = await crawl(
+        session, "https://x.org/a", host="x.org", budget=timedelta(minutes=1)
+    )
+
+    assert len(urls) == 4
+
+
+@pytest.mark.parametrize("order", ["expiry", "change"])
+async def test_cached_metadata_order(fake_session, tmp_path, order):
+    session = fake_session(
+        {
+            "https://x.org/a": (
+                "https://x.org/a",
+                links("https://x.org/b", "https://x.org/c", "https://x.org/d"),
+            )
+        }
+    )
+
+    # b expires later and changes less often than c; d has never been seen
+    cache = Cache(str(tmp_path))
+    now = datetime.now(timezone.utc)
+    for name, ttl, change_rate in (("b", 2, 0.1), ("c", 1, 0.9)):
+        url = URL(f"https://x.org/{name}")
+        meta = PageMeta(
+            url=url.human_repr(),  # type: ignore
+            sha="sha",
+            exp=now + timedelta(hours=ttl),
+            iat=now,
+            change_rate=change_rate,
+        )
+        await cache.set_meta(url, meta)
+        await cache.set_page(url, "")
+
+    urls = await crawl(
+        session,
+        "https://x.org/a",
+        cache,
+        host="x.org",
+        concurrency=1,
+        order=order,
+    )
+
+    assert urls == [
+        "https://x.org/a",
+        "https://x.org/d",
+        "https://x.org/c",
+        "https://x.org/b",
+    ]
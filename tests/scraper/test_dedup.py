@@ -0,0 +1,45 @@
+import pytest
+
+from src.scraper.dedup import Deduplicator
+
+TEXT = " ".join(f"word{i}" for i in range(200))
+
+
+def test_detects_near_duplicate_page():
+    dedup = Deduplicator(page_threshold=0.9)
+
+    assert dedup.check_page("a", TEXT) is None
+    assert dedup.check_page("b", TEXT + " trailer") == "a"
+    assert dedup.stats.duplicate_pages == 1
+
+
+def test_keeps_different_pages():
+    dedup = Deduplicator()
+
+    assert dedup.check_page("a", TEXT) is None
+    assert dedup.check_page("b", "an entirely different text about cats") is None
+    assert dedup.stats.page_shrinkage == 0
+
+
+def test_key_seen_again_is_not_its_own_duplicate():
+    dedup = Deduplicator()
+
+    assert dedup.check_page("a", TEXT) is None
+    assert dedup.check_page("a", TEXT) is None
+    assert dedup.check_page("b", TEXT) == "a"
+
+
+def test_detects_duplicate_chunks():
+    dedup = Deduplicator()
+
+    assert dedup.check_chunk(0, "This article is a stub.") is None
+    assert dedup.check_chunk(1, "This article is a stub.") == 0
+    assert dedup.stats.shrinkage == pytest.approx(0.5)
+
+
+def test_exact_threshold_matches_equal_signatures_only():
+    dedup = Deduplicator(page_threshold=1.0)
+
+    assert dedup.check_page("a", TEXT) is None
+    assert dedup.check_page("b", TEXT) == "a"
+    assert dedup.check_page("c", "something else entirely") is None
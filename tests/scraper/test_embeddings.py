@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+
+from src.scraper.embeddings import EmbeddingCache
+
+
+def test_lookup_returns_stored_embeddings(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), model="m", dimension=4)
+    cache.store(["a", "b"], np.arange(8, dtype=np.float32).reshape(2, 4))
+
+    a, missing, b = cache.lookup(["a", "x", "b"])
+
+    assert missing is None
+    np.testing.assert_array_equal(a, [0, 1, 2, 3])
+    np.testing.assert_array_equal(b, [4, 5, 6, 7])
+
+
+def test_store_grows_past_capacity(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), model="m", dimension=2, capacity=1)
+    tokens = [str(i) for i in range(10)]
+    cache.store(tokens, np.arange(20, dtype=np.float32).reshape(10, 2))
+
+    assert len(cache) == 10
+    np.testing.assert_array_equal(cache.lookup(["9"])[0], [18, 19])
+
+
+def test_store_keeps_first_embedding_of_token(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), model="m", dimension=2)
+    cache.store(["a"], np.array([[1, 1]], dtype=np.float32))
+    cache.store(["a"], np.array([[2, 2]], dtype=np.float32))
+
+    assert len(cache) == 1
+    np.testing.assert_array_equal(cache.lookup(["a"])[0], [1, 1])
+
+
+def test_context_manager_persists_embeddings(tmp_path):
+    with EmbeddingCache(str(tmp_path), model="m", dimension=2) as cache:
+        cache.store(["a"], np.array([[3, 4]], dtype=np.float32))
+
+    reopened = EmbeddingCache(str(tmp_path), model="m", dimension=2)
+
+    np.testing.assert_array_equal(reopened.lookup(["a"])[0], [3, 4])
+
+
+def test_models_do_not_share_embeddings(tmp_path):
+    with EmbeddingCache(str(tmp_path), model="m", dimension=2) as cache:
+        cache.store(["a"], np.array([[3, 4]], dtype=np.float32))
+
+    other = EmbeddingCache(str(tmp_path), model="n", dimension=2)
+
+    assert other.lookup(["a"]) == [None]
+
+
+def test_flush_while_storing_in_another_thread(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), model="m", dimension=2, capacity=1)
+    tokens = [str(i) for i in range(2000)]
+
+    def store() -> None:
+        for i in range(0, len(tokens), 10):
+            cache.store(tokens[i : i + 10], np.ones((10, 2), dtype=np.float32))
+
+    thread = threading.Thread(target=store)
+    thread.start()
+    while thread.is_alive():
+        cache.flush()
+    thread.join()
+    cache.flush()
+
+    reloaded = EmbeddingCache(str(tmp_path), model="m", dimension=2)
+    assert len(reloaded) == len(tokens)
@@ -0,0 +1,70 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.scraper.encoder import AbstractEncoder, compare_encoders
+
+CORPUS = [
+    "Cats purr when they are happy.",
+    "Dogs bark at strangers.",
+    "Birds sing in the morning.",
+    "Fish swim in the sea.",
+    "Horses gallop across fields.",
+]
+QUERIES = ["Cats purr", "Birds sing", "Horses gallop"]
+
+
+class NoisyEncoder(AbstractEncoder):
+    """Wraps an encoder and adds noise to its embeddings."""
+
+    def __init__(self, encoder: AbstractEncoder, scale: float) -> None:
+        self._encoder = encoder
+        self._rng = np.random.default_rng(0)
+        self._scale = scale
+
+    @property
+    def name(self) -> str:
+        return f"{self._encoder.name}:noisy"
+
+    @property
+    def dimension(self) -> int:
+        return self._encoder.dimension
+
+    def encode(self, tokens: List[str]) -> np.ndarray:
+        embeddings = self._encoder.encode(tokens)
+        noise = self._rng.normal(scale=self._scale, size=embeddings.shape)
+
+        return (embeddings + noise).astype(np.float32)
+
+
+def test_encoder_agrees_with_itself(encoder):
+    agreement = compare_encoders(encoder, encoder, CORPUS, QUERIES, k=2)
+
+    assert agreement.cosine_mean == pytest.approx(1.0)
+    assert agreement.cosine_min == pytest.approx(1.0)
+    assert agreement.overlap == 1.0
+
+
+def test_noisy_encoder_agrees_less(encoder):
+    agreement = compare_encoders(
+        encoder, NoisyEncoder(encoder, 1.0), CORPUS, QUERIES, k=2
+    )
+
+    assert agreement.cosine_min < agreement.cosine_mean < 1.0
+    assert agreement.overlap < 1.0
+
+
+def test_onnx_encoder_name_depends_on_quantization(tmp_path):
+    pytest.importorskip("optimum")
+
+    from src.scraper.encoder import OnnxEncoder
+
+    model = "sentence-transformers-testing/stsb-bert-tiny-safetensors"
+
+    plain = OnnxEncoder(model, path=str(tmp_path))
+    quantized = OnnxEncoder(model, path=str(tmp_path), quantize=True)
+
+    # Embedding cache entries never mix models of different precision
+    assert plain.name != quantized.name
+    assert plain.dimension == quantized.dimension
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import aiohttp
+from yarl import URL
+
+from src.scraper.cache import Cache
+from src.scraper.canonicalizer import Canonicalizer
+from src.scraper.fetcher import Fetcher
+
+PAGE = "<html><body>Page</body></html>"
+
+
+def build_fetcher(session, tmp_path, canonicalizer=None) -> Fetcher:
+    return Fetcher(
+        session,
+        aiohttp.ClientTimeout(),
+        cache_map=Cache(str(tmp_path)),
+        cache_ttl=timedelta(hours=1),
+        canonicalizer=canonicalizer,
+    )
+
+
+async def test_cached_page_is_not_fetched_again(fake_session, tmp_path):
+    session = fake_session({"https://x.org/a": ("https://x.org/a", PAGE)})
+    fetch = build_fetcher(session, tmp_path)
+
+    assert await fetch(URL("https://x.org/a")) == PAGE
+    assert await fetch(URL("https://x.org/a")) == PAGE
+    assert len(session.requests) == 1
+
+
+async def test_redirect_is_fetched_once(fake_session, tmp_path):
+    session = fake_session({"https://x.org/a": ("https://x.org/b", PAGE)})
+    canonicalizer = Canonicalizer()
+    fetch = build_fetcher(session, tmp_path, canonicalizer)
+
+    assert await fetch(URL("https://x.org/a")) == PAGE
+    assert str(canonicalizer(URL("https://x.org/a"))) == "https://x.org/b"
+
+    assert await fetch(URL("https://x.org/b")) == PAGE
+    assert len(session.requests) == 1
+
+
+async def test_alias_survives_cache_hit(fake_session, tmp_path):
+    page = '<link rel="canonical" href="/b">' + PAGE
+    session = fake_session({"https://x.org/a": ("https://x.org/a", page)})
+    await build_fetcher(session, tmp_path, Canonicalizer())(URL("https://x.org/a"))
+
+    # A fresh canonicalizer learns the alias from cached metadata
+    canonicalizer = Canonicalizer()
+    fetch = build_fetcher(session, tmp_path, canonicalizer)
+
+    assert await fetch(URL("https://x.org/a")) == page
+    assert str(canonicalizer(URL("https://x.org/a"))) == "https://x.org/b"
+    assert len(session.requests) == 1
+
+
+async def test_canonical_link_does_not_cache_canonical_page(fake_session, tmp_path):
+    page = '<link rel="canonical" href="/b">' + PAGE
+    session = fake_session(
+        {
+            "https://x.org/a": ("https://x.org/a", page),
+            "https://x.org/b": ("https://x.org/b", PAGE),
+        }
+    )
+    fetch = build_fetcher(session, tmp_path, Canonicalizer())
+
+    assert await fetch(URL("https://x.org/a")) == page
+
+    # The alias response is not the canonical page, so it is fetched
+    assert await fetch(URL("https://x.org/b")) == PAGE
+    assert len(session.requests) == 2
+
+
+async def test_redirect_keeps_fresh_canonical_page(fake_session, tmp_path):
+    session = fake_session(
+        {
+            "https://x.org/a": ("https://x.org/b", "<html>Changed</html>"),
+            "https://x.org/b": ("https://x.org/b", PAGE),
+        }
+    )
+    cache = Cache(str(tmp_path))
+    fetch = build_fetcher(session, tmp_path, Canonicalizer())
+
+    assert await fetch(URL("https://x.org/b")) == PAGE
+    meta = await cache.get_meta(URL("https://x.org/b"))
+
+    await fetch(URL("https://x.org/a"))
+
+    assert await cache.get_meta(URL("https://x.org/b")) == meta
+    assert await cache.get_page(URL("https://x.org/b")) == PAGE
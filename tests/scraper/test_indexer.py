@@ -0,0 +1,110 @@
+import pytest
+from yarl import URL
+
+from src.scraper.indexer import Indexer
+from src.scraper.lexicon import LexicalIndex
+
+PAGES = {
+    URL("https://x.org/cats"): ["Cats purr when they are happy.", "Cats hunt mice."],
+    URL("https://x.org/dogs"): ["Dogs bark at strangers.", "Dogs love long walks."],
+    URL("https://x.org/birds"): ["Birds sing in the morning.", "Birds build nests."],
+}
+
+
+def build_indexer(encoder, **kwargs) -> Indexer:
+    return Indexer(encoder, dimension=encoder.dimension, threshold=0.9, **kwargs)
+
+
+def fill(indexer: Indexer) -> None:
+    for url, tokens in PAGES.items():
+        indexer.append(url, " ".join(tokens), tokens, url.name.title())
+
+
+def test_dense_search_finds_page(encoder):
+    indexer = build_indexer(encoder)
+    fill(indexer)
+
+    urls = [url for url, _ in indexer.search("Dogs bark at strangers.", 1)]
+
+    assert urls == [URL("https://x.org/dogs")]
+
+
+def test_skips_near_duplicate_page(encoder):
+    indexer = build_indexer(encoder, dedup=True)
+    fill(indexer)
+
+    mirror = URL("https://x.org/cats/print")
+    tokens = PAGES[URL("https://x.org/cats")]
+    indexer.append(mirror, " ".join(tokens), tokens)
+
+    assert indexer.aliases == {mirror: URL("https://x.org/cats")}
+
+
+def test_skips_near_duplicate_chunks(encoder):
+    indexer = build_indexer(encoder, dedup=True)
+    fill(indexer)
+
+    # A different page quoting the birds page
+    url = URL("https://x.org/zoo")
+    tokens = ["Zebras graze on the savanna.", *PAGES[URL("https://x.org/birds")]]
+    indexer.append(url, " ".join(tokens), tokens)
+
+    assert indexer.aliases == {}
+    assert indexer.mirrors == {URL("https://x.org/birds"): [url, url]}
+    assert indexer.dedup_stats.duplicate_chunks == 2  # type: ignore
+
+
+def test_lexical_search_needs_lexicon(encoder):
+    indexer = build_indexer(encoder)
+    fill(indexer)
+
+    with pytest.raises(ValueError):
+        indexer.search("cats", 1, mode="lexical")
+
+
+def test_hybrid_search_skips_encoder_when_confident(encoder):
+    indexer = build_indexer(encoder, lexicon=LexicalIndex())
+    fill(indexer)
+    encoder.calls.clear()
+
+    # The cats page matches twice as many words, and more often
+    query = "cats purr morning"
+    urls = [url for url, _ in indexer.search(query, 1, mode="hybrid")]
+
+    assert urls == [URL("https://x.org/cats")]
+    assert encoder.calls == []
+
+
+def test_hybrid_search_for_top_1_checks_runner_up(encoder):
+    indexer = build_indexer(encoder, lexicon=LexicalIndex())
+    fill(indexer)
+    encoder.calls.clear()
+
+    # Both pages match equally well, so the lexical ranking is not confident
+    results = indexer.search("cats dogs", 1, mode="hybrid")
+
+    assert len(results) == 1
+    assert encoder.calls == [["cats dogs"]]
+
+
+def test_hybrid_search_trusts_lone_match_of_all_words(encoder):
+    indexer = build_indexer(encoder, lexicon=LexicalIndex())
+    fill(indexer)
+    encoder.calls.clear()
+
+    # A unique title
+    urls = [url for url, _ in indexer.search("Birds", 1, mode="hybrid")]
+
+    assert urls == [URL("https://x.org/birds")]
+    assert encoder.calls == []
+
+
+def test_hybrid_search_does_not_trust_lone_match_of_some_words(encoder):
+    indexer = build_indexer(encoder, lexicon=LexicalIndex())
+    fill(indexer)
+    encoder.calls.clear()
+
+    urls = [url for url, _ in indexer.search("nests zebras", 2, mode="hybrid")]
+
+    assert urls[0] == URL("https://x.org/birds")
+    assert encoder.calls == [["nests zebras"]]
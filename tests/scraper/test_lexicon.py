@@ -0,0 +1,69 @@
+from src.scraper.lexicon import LexicalIndex
+
+
+def build_lexicon(**kwargs) -> LexicalIndex[str]:
+    lexicon: LexicalIndex[str] = LexicalIndex(**kwargs)
+
+    lexicon.append("cats", ["Cats purr.", "Cats hunt mice."], "Cats")
+    lexicon.append("dogs", ["Dogs bark at cats."], "Dogs")
+    lexicon.append("birds", ["Birds sing.", "Birds build nests."], "Birds")
+
+    return lexicon
+
+
+def test_ranks_by_term_frequency():
+    lexicon = build_lexicon()
+
+    keys = [key for key, _ in lexicon.search("cats", 3)]
+
+    assert keys == ["cats", "dogs"]
+
+
+def test_rare_words_weigh_more():
+    lexicon = build_lexicon()
+
+    # "cats" matches two pages, "bark" only one
+    keys = [key for key, _ in lexicon.search("cats bark", 3)]
+
+    assert keys[0] == "dogs"
+
+
+def test_title_boost():
+    lexicon: LexicalIndex[str] = LexicalIndex(title_boost=10)
+    lexicon.append("body", ["Owls owls owls."])
+    lexicon.append("title", ["Owls."], "Owls")
+
+    keys = [key for key, _ in lexicon.search("owls", 2)]
+
+    assert keys == ["title", "body"]
+
+
+def test_unknown_words_match_nothing():
+    lexicon = build_lexicon()
+
+    assert lexicon.search("zebras", 3) == []
+    assert lexicon.search("", 3) == []
+
+
+def test_covers():
+    lexicon = build_lexicon()
+
+    assert lexicon.covers("Cats bark")
+    assert not lexicon.covers("cats zebras")
+    assert not lexicon.covers("")
+
+
+def test_truncates_to_k():
+    lexicon = build_lexicon()
+
+    assert len(lexicon.search("cats birds", 1)) == 1
+
+
+def test_append_after_search():
+    lexicon = build_lexicon()
+    assert lexicon.search("owls", 3) == []
+
+    lexicon.append("owls", ["Owls hoot at night."], "Owls")
+
+    assert [key for key, _ in lexicon.search("owls", 3)] == ["owls"]
+    assert len(lexicon) == 4
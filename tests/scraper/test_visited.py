@@ -0,0 +1,57 @@
+import pytest
+from yarl import URL
+
+from src.scraper import visited
+from src.scraper.visited import VisitedSet
+
+URLS = [URL(f"https://x.org/page/{i}") for i in range(200)]
+
+
+@pytest.mark.parametrize("bloom_capacity", [None, 1000, 8])
+def test_adds_each_url_once(bloom_capacity):
+    urls = VisitedSet(bloom_capacity=bloom_capacity)
+
+    assert all(urls.add(url) for url in URLS)
+    assert not any(urls.add(url) for url in URLS)
+
+    assert len(urls) == len(URLS)
+    assert all(url in urls for url in URLS)
+    assert URL("https://x.org/unknown") not in urls
+
+
+@pytest.mark.parametrize("bloom_capacity", [None, 1000])
+def test_grows_past_capacity(bloom_capacity):
+    urls = VisitedSet(2, bloom_capacity=bloom_capacity)
+
+    for url in URLS:
+        urls.add(url)
+
+    slots = len(urls._slots)
+
+    assert slots & (slots - 1) == 0
+    assert len(urls) * 2 <= slots
+    assert all(url in urls for url in URLS)
+
+
+@pytest.mark.parametrize("bloom_capacity", [None, 1000])
+def test_colliding_fingerprints(monkeypatch, bloom_capacity):
+    # Equal low bits send every URL to the same home slot, even after growth
+    fingerprints = {url: (i + 1) << 32 | 5 for i, url in enumerate(URLS[:50])}
+    monkeypatch.setattr(visited, "_fingerprint", fingerprints.__getitem__)
+
+    urls = VisitedSet(4, bloom_capacity=bloom_capacity)
+
+    assert all(urls.add(url) for url in fingerprints)
+    assert not any(urls.add(url) for url in fingerprints)
+    assert len(urls) == len(fingerprints)
+
+
+def test_bloom_miss_skips_lookup(monkeypatch):
+    urls = VisitedSet(bloom_capacity=1000)
+
+    def probe(fingerprint: int) -> int:
+        raise AssertionError("New URL looked up")
+
+    monkeypatch.setattr(urls, "_probe", probe)
+
+    assert all(urls.add(url) for url in URLS[:10])